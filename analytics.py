@@ -5,12 +5,20 @@ Usage:
     python analytics.py
 """
 
+import io
 import json
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
-from collections import defaultdict
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
 from loguru import logger
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 # Configure logging
 logger.remove()
@@ -19,227 +27,324 @@ logger.add(sys.stdout, level="INFO", format="<level>{message}</level>")
 # File paths
 DATA_DIR = Path('data')
 TRADE_HISTORY_FILE = DATA_DIR / 'trade_history.json'
+REPORT_CACHE_FILE = DATA_DIR / '.analytics_cache.json'
+
+# Fields used by the report and their defaults when a trade doesn't record them
+TRADE_DEFAULTS = {
+    'regime': 'unknown',
+    'symbol': 'unknown',
+    'exit_reason': 'unknown',
+    'hour_of_day': 0,
+    'pnl': 0,
+    'duration_hours': 0
+}
+
+# Report keys stored as categoricals so grouping reuses their integer codes
+CATEGORICAL_COLUMNS = ('regime', 'symbol', 'exit_reason')
+
+def _aggregate_codes(codes, n_groups, pnl, duration):
+    """
+    Per-group sums over integer group codes
+    
+    Works on flat arrays (one per field) so each total is a single bincount
+    pass in C rather than a Python loop over trade dicts.
+    """
+    win = pnl > 0
+    return {
+        'total': np.bincount(codes, minlength=n_groups),
+        'wins': np.bincount(codes, weights=win, minlength=n_groups).astype(np.int64),
+        'total_pnl': np.bincount(codes, weights=pnl, minlength=n_groups),
+        'win_sum': np.bincount(codes, weights=np.where(win, pnl, 0.0), minlength=n_groups),
+        'loss_sum': np.bincount(codes, weights=np.where(win, 0.0, pnl), minlength=n_groups),
+        'dur_sum': np.bincount(codes, weights=duration, minlength=n_groups)
+    }
 
 class PerformanceAnalytics:
     """Analyze trading performance by regime, time, symbol, etc."""
     
     def __init__(self):
-        self.trades = self._load_trades()
+        self.df = self._load_trades()
     
     def _load_trades(self):
-        """Load trade history"""
+        """Load trade history into a DataFrame of the fields used by the report"""
         try:
             if TRADE_HISTORY_FILE.exists():
-                with open(TRADE_HISTORY_FILE, 'r') as f:
-                    trades = json.load(f)
-                logger.info(f"✓ Loaded {len(trades)} trades")
-                return trades
+                df = self._build_frame(self._iter_trades())
+                logger.info(f"✓ Loaded {len(df)} trades")
+                return df
         except Exception as e:
             logger.error(f"Error loading trades: {e}")
-        return []
+        return self._build_frame([])
     
-    def analyze_by_regime(self):
-        """Analyze win rate and profitability by market regime"""
-        print("\n" + "="*80)
-        print("PERFORMANCE BY MARKET REGIME")
-        print("="*80 + "\n")
-        
-        regime_stats = defaultdict(lambda: {
-            'total': 0,
-            'wins': 0,
-            'losses': 0,
-            'total_pnl': 0,
-            'avg_win': [],
-            'avg_loss': [],
-            'avg_duration': []
-        })
-        
-        for trade in self.trades:
-            regime = trade.get('regime', 'unknown')
-            pnl = trade.get('pnl', 0)
-            duration = trade.get('duration_hours', 0)
+    def _iter_trades(self):
+        """
+        Yield trades from the history file one at a time
+        
+        Accepts a JSON array (what the bot writes) or newline-delimited JSON
+        with one trade per line, which is decoded line by line so the full
+        list of trade dicts is never held in memory.
+        """
+        with open(TRADE_HISTORY_FILE, 'rb') as f:
+            is_array = f.read(64).lstrip().startswith(b'[')
+            f.seek(0)
             
-            regime_stats[regime]['total'] += 1
-            regime_stats[regime]['total_pnl'] += pnl
-            regime_stats[regime]['avg_duration'].append(duration)
+            if is_array:
+                yield from _loads(f.read())
+                return
             
-            if pnl > 0:
-                regime_stats[regime]['wins'] += 1
-                regime_stats[regime]['avg_win'].append(pnl)
-            else:
-                regime_stats[regime]['losses'] += 1
-                regime_stats[regime]['avg_loss'].append(pnl)
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield _loads(line)
+    
+    def _build_frame(self, trades):
+        """Build a DataFrame with the fields used by the report (missing values get defaults)"""
+        columns = {column: [] for column in TRADE_DEFAULTS}
+        
+        # Bind list.append / dict.get once instead of re-resolving them per field
+        fields = [(column, default, columns[column].append) for column, default in TRADE_DEFAULTS.items()]
+        
+        for trade in trades:
+            get = trade.get
+            for column, default, append in fields:
+                value = get(column)
+                append(default if value is None else value)
+        
+        df = pd.DataFrame(columns)
+        df['hour_of_day'] = df['hour_of_day'].astype(int)
+        
+        # Hash the string keys once; categories keep first-appearance order
+        for column in CATEGORICAL_COLUMNS:
+            df[column] = pd.Categorical(df[column], categories=pd.unique(df[column]))
+        return df
+    
+    def _stats_from_codes(self, codes, groups):
+        """Build the per-group stats table from integer group codes"""
+        stats = pd.DataFrame(
+            _aggregate_codes(
+                codes,
+                len(groups),
+                self.df['pnl'].to_numpy(dtype=np.float64),
+                self.df['duration_hours'].to_numpy(dtype=np.float64)
+            ),
+            index=groups
+        )
+        stats['losses'] = stats['total'] - stats['wins']
+        
+        # Running sums -> averages (0 when a group has no wins/losses)
+        stats['avg_win'] = (stats['win_sum'] / stats['wins']).where(stats['wins'] > 0, 0.0)
+        stats['avg_loss'] = (stats['loss_sum'] / stats['losses']).where(stats['losses'] > 0, 0.0)
+        stats['avg_duration'] = stats['dur_sum'] / stats['total'].where(stats['total'] > 0)
+        return stats
+    
+    def _group_stats(self, key, sort=False):
+        """Aggregate trade count, wins/losses, P&L and duration per value of `key`"""
+        column = self.df[key]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes, groups = column.cat.codes.to_numpy(), column.cat.categories
+        else:
+            codes, groups = pd.factorize(column, sort=sort)
+        return self._stats_from_codes(codes, pd.Index(groups, name=key))
+    
+    def _hour_stats(self):
+        """Per-hour stats (ascending, only hours with trades) using the hour itself as the bin"""
+        hours = self.df['hour_of_day'].to_numpy(dtype=np.int64)
+        if hours.size and hours.min() < 0:
+            # Not a clock hour - fall back to generic grouping
+            return self._group_stats('hour_of_day', sort=True)
+        
+        n_bins = max(24, int(hours.max()) + 1) if hours.size else 24
+        stats = self._stats_from_codes(hours, pd.RangeIndex(n_bins, name='hour_of_day'))
+        return stats[stats['total'] > 0]
+    
+    def _aggregate_all(self):
+        """Compute every breakdown used by the report in one place"""
+        return SimpleNamespace(
+            regime=self._group_stats('regime'),
+            symbol=self._group_stats('symbol'),
+            hour=self._hour_stats(),
+            exit_reason=self._group_stats('exit_reason')
+        )
+    
+    def analyze_by_regime(self, regime_stats=None, out=None):
+        """Analyze win rate and profitability by market regime"""
+        print("\n" + "="*80, file=out)
+        print("PERFORMANCE BY MARKET REGIME", file=out)
+        print("="*80 + "\n", file=out)
+        
+        if regime_stats is None:
+            regime_stats = self._group_stats('regime')
+        
+        # Profit factor is undefined (inf) when there are no losing trades
+        has_losses = (regime_stats['losses'] > 0) & (regime_stats['avg_loss'] != 0)
+        profit_factors = (
+            (regime_stats['avg_win'] * regime_stats['wins']).abs() /
+            (regime_stats['avg_loss'] * regime_stats['losses']).abs()
+        ).where(has_losses, float('inf'))
         
         # Sort by total trades
-        sorted_regimes = sorted(regime_stats.items(), key=lambda x: x[1]['total'], reverse=True)
+        regime_stats = regime_stats.assign(profit_factor=profit_factors)
+        regime_stats = regime_stats.sort_values('total', ascending=False, kind='stable')
         
-        for regime, stats in sorted_regimes:
-            total = stats['total']
-            wins = stats['wins']
-            losses = stats['losses']
+        for regime, stats in regime_stats.iterrows():
+            total = int(stats['total'])
+            wins = int(stats['wins'])
+            losses = int(stats['losses'])
             win_rate = (wins / total * 100) if total > 0 else 0
             
-            avg_win = sum(stats['avg_win']) / len(stats['avg_win']) if stats['avg_win'] else 0
-            avg_loss = sum(stats['avg_loss']) / len(stats['avg_loss']) if stats['avg_loss'] else 0
-            avg_duration = sum(stats['avg_duration']) / len(stats['avg_duration']) if stats['avg_duration'] else 0
-            
-            profit_factor = abs(avg_win * wins / (avg_loss * losses)) if losses > 0 and avg_loss != 0 else float('inf')
-            
             emoji = {"trending": "📈", "high_volatility": "⚡", "choppy": "〰️", "low_volatility": "💤"}.get(regime, "❓")
             
-            print(f"{emoji} {regime.upper()}")
-            print(f"   Trades: {total} ({wins}W / {losses}L)")
-            print(f"   Win Rate: {win_rate:.1f}%")
-            print(f"   Total P&L: ${stats['total_pnl']:+.2f}")
-            print(f"   Avg Win: ${avg_win:.2f} | Avg Loss: ${avg_loss:.2f}")
-            print(f"   Profit Factor: {profit_factor:.2f}")
-            print(f"   Avg Duration: {avg_duration:.1f} hours")
-            print()
-    
-    def analyze_by_symbol(self):
+            print(f"{emoji} {regime.upper()}", file=out)
+            print(f"   Trades: {total} ({wins}W / {losses}L)", file=out)
+            print(f"   Win Rate: {win_rate:.1f}%", file=out)
+            print(f"   Total P&L: ${stats['total_pnl']:+.2f}", file=out)
+            print(f"   Avg Win: ${stats['avg_win']:.2f} | Avg Loss: ${stats['avg_loss']:.2f}", file=out)
+            print(f"   Profit Factor: {stats['profit_factor']:.2f}", file=out)
+            print(f"   Avg Duration: {stats['avg_duration']:.1f} hours", file=out)
+            print(file=out)
+    
+    def analyze_by_symbol(self, symbol_stats=None, out=None):
         """Analyze performance by trading pair"""
-        print("\n" + "="*80)
-        print("PERFORMANCE BY SYMBOL")
-        print("="*80 + "\n")
-        
-        symbol_stats = defaultdict(lambda: {
-            'total': 0,
-            'wins': 0,
-            'losses': 0,
-            'total_pnl': 0
-        })
-        
-        for trade in self.trades:
-            symbol = trade.get('symbol', 'unknown')
-            pnl = trade.get('pnl', 0)
-            
-            symbol_stats[symbol]['total'] += 1
-            symbol_stats[symbol]['total_pnl'] += pnl
-            
-            if pnl > 0:
-                symbol_stats[symbol]['wins'] += 1
-            else:
-                symbol_stats[symbol]['losses'] += 1
+        print("\n" + "="*80, file=out)
+        print("PERFORMANCE BY SYMBOL", file=out)
+        print("="*80 + "\n", file=out)
+        
+        if symbol_stats is None:
+            symbol_stats = self._group_stats('symbol')
         
         # Sort by total P&L
-        sorted_symbols = sorted(symbol_stats.items(), key=lambda x: x[1]['total_pnl'], reverse=True)
+        symbol_stats = symbol_stats.sort_values('total_pnl', ascending=False, kind='stable')
         
-        for symbol, stats in sorted_symbols:
-            total = stats['total']
-            wins = stats['wins']
+        for symbol, stats in symbol_stats.iterrows():
+            total = int(stats['total'])
+            wins = int(stats['wins'])
             win_rate = (wins / total * 100) if total > 0 else 0
             
-            print(f"💱 {symbol}")
-            print(f"   Trades: {total} ({wins}W / {stats['losses']}L)")
-            print(f"   Win Rate: {win_rate:.1f}%")
-            print(f"   Total P&L: ${stats['total_pnl']:+.2f}")
-            print()
+            print(f"💱 {symbol}", file=out)
+            print(f"   Trades: {total} ({wins}W / {int(stats['losses'])}L)", file=out)
+            print(f"   Win Rate: {win_rate:.1f}%", file=out)
+            print(f"   Total P&L: ${stats['total_pnl']:+.2f}", file=out)
+            print(file=out)
     
-    def analyze_by_hour(self):
+    def analyze_by_hour(self, hour_stats=None, out=None):
         """Analyze performance by hour of day"""
-        print("\n" + "="*80)
-        print("PERFORMANCE BY HOUR OF DAY")
-        print("="*80 + "\n")
-        
-        hour_stats = defaultdict(lambda: {
-            'total': 0,
-            'wins': 0,
-            'total_pnl': 0
-        })
-        
-        for trade in self.trades:
-            hour = trade.get('hour_of_day', 0)
-            pnl = trade.get('pnl', 0)
-            
-            hour_stats[hour]['total'] += 1
-            hour_stats[hour]['total_pnl'] += pnl
-            
-            if pnl > 0:
-                hour_stats[hour]['wins'] += 1
+        print("\n" + "="*80, file=out)
+        print("PERFORMANCE BY HOUR OF DAY", file=out)
+        print("="*80 + "\n", file=out)
         
-        # Show only hours with trades
-        active_hours = sorted([h for h in hour_stats.keys() if hour_stats[h]['total'] > 0])
+        # Only hours with trades are present, sorted ascending
+        if hour_stats is None:
+            hour_stats = self._hour_stats()
         
-        for hour in active_hours:
-            stats = hour_stats[hour]
-            total = stats['total']
-            wins = stats['wins']
+        for hour, stats in hour_stats.iterrows():
+            total = int(stats['total'])
+            wins = int(stats['wins'])
             win_rate = (wins / total * 100) if total > 0 else 0
             
-            print(f"🕐 {hour:02d}:00 UTC")
-            print(f"   Trades: {total} ({wins}W)")
-            print(f"   Win Rate: {win_rate:.1f}%")
-            print(f"   Total P&L: ${stats['total_pnl']:+.2f}")
-            print()
+            print(f"🕐 {hour:02d}:00 UTC", file=out)
+            print(f"   Trades: {total} ({wins}W)", file=out)
+            print(f"   Win Rate: {win_rate:.1f}%", file=out)
+            print(f"   Total P&L: ${stats['total_pnl']:+.2f}", file=out)
+            print(file=out)
     
-    def analyze_by_exit_reason(self):
+    def analyze_by_exit_reason(self, exit_stats=None, out=None):
         """Analyze performance by exit reason"""
-        print("\n" + "="*80)
-        print("PERFORMANCE BY EXIT REASON")
-        print("="*80 + "\n")
-        
-        exit_stats = defaultdict(lambda: {
-            'total': 0,
-            'total_pnl': 0,
-            'avg_duration': []
-        })
-        
-        for trade in self.trades:
-            exit_reason = trade.get('exit_reason', 'unknown')
-            pnl = trade.get('pnl', 0)
-            duration = trade.get('duration_hours', 0)
-            
-            exit_stats[exit_reason]['total'] += 1
-            exit_stats[exit_reason]['total_pnl'] += pnl
-            exit_stats[exit_reason]['avg_duration'].append(duration)
+        print("\n" + "="*80, file=out)
+        print("PERFORMANCE BY EXIT REASON", file=out)
+        print("="*80 + "\n", file=out)
+        
+        if exit_stats is None:
+            exit_stats = self._group_stats('exit_reason')
         
-        for exit_reason, stats in exit_stats.items():
-            total = stats['total']
-            avg_duration = sum(stats['avg_duration']) / len(stats['avg_duration']) if stats['avg_duration'] else 0
+        for exit_reason, stats in exit_stats.iterrows():
+            total = int(stats['total'])
             
             emoji = {"completed": "🎯", "stopped": "🛑", "manual": "✋"}.get(exit_reason, "❓")
             
-            print(f"{emoji} {exit_reason.upper()}")
-            print(f"   Trades: {total}")
-            print(f"   Total P&L: ${stats['total_pnl']:+.2f}")
-            print(f"   Avg P&L: ${stats['total_pnl']/total:+.2f}")
-            print(f"   Avg Duration: {avg_duration:.1f} hours")
-            print()
+            print(f"{emoji} {exit_reason.upper()}", file=out)
+            print(f"   Trades: {total}", file=out)
+            print(f"   Total P&L: ${stats['total_pnl']:+.2f}", file=out)
+            print(f"   Avg P&L: ${stats['total_pnl']/total:+.2f}", file=out)
+            print(f"   Avg Duration: {stats['avg_duration']:.1f} hours", file=out)
+            print(file=out)
     
     def generate_summary(self):
         """Generate overall summary"""
-        if not self.trades:
+        if self.df.empty:
             print("\n⚠️  No trade data available for analysis\n")
             return
         
-        print("\n" + "="*80)
-        print("📊 TRADING PERFORMANCE ANALYTICS")
-        print("="*80)
+        # Build the whole report in memory and write it in one go
+        out = io.StringIO()
+        
+        print("\n" + "="*80, file=out)
+        print("📊 TRADING PERFORMANCE ANALYTICS", file=out)
+        print("="*80, file=out)
         
         # Overall stats
-        total_trades = len(self.trades)
-        wins = len([t for t in self.trades if t.get('pnl', 0) > 0])
-        losses = len([t for t in self.trades if t.get('pnl', 0) <= 0])
+        pnl = self.df['pnl']
+        total_trades = len(pnl)
+        wins = int((pnl > 0).sum())
+        losses = total_trades - wins
         win_rate = (wins / total_trades * 100) if total_trades > 0 else 0
-        total_pnl = sum(t.get('pnl', 0) for t in self.trades)
+        total_pnl = float(pnl.sum())
+        
+        print(f"\nTotal Trades: {total_trades}", file=out)
+        print(f"Wins: {wins} | Losses: {losses}", file=out)
+        print(f"Win Rate: {win_rate:.1f}%", file=out)
+        print(f"Total P&L: ${total_pnl:+.2f}", file=out)
         
-        print(f"\nTotal Trades: {total_trades}")
-        print(f"Wins: {wins} | Losses: {losses}")
-        print(f"Win Rate: {win_rate:.1f}%")
-        print(f"Total P&L: ${total_pnl:+.2f}")
+        # Detailed breakdowns (aggregated once, then printed)
+        stats = self._aggregate_all()
+        self.analyze_by_regime(stats.regime, out)
+        self.analyze_by_symbol(stats.symbol, out)
+        self.analyze_by_exit_reason(stats.exit_reason, out)
+        self.analyze_by_hour(stats.hour, out)
         
-        # Detailed breakdowns
-        self.analyze_by_regime()
-        self.analyze_by_symbol()
-        self.analyze_by_exit_reason()
-        self.analyze_by_hour()
+        print("="*80 + "\n", file=out)
         
-        print("="*80 + "\n")
+        report = out.getvalue()
+        sys.stdout.write(report)
+        return report
+
+def _report_cache_key():
+    """Identify the current trade history (and report code) by mtime + size"""
+    history = TRADE_HISTORY_FILE.stat()
+    return [history.st_mtime_ns, history.st_size, Path(__file__).stat().st_mtime_ns]
+
+def _load_cached_report(key):
+    """Return the cached report text if it was built from the same trade history"""
+    try:
+        cache = json.loads(REPORT_CACHE_FILE.read_text(encoding='utf-8'))
+        if cache.get('key') == key:
+            return cache.get('report')
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _save_cached_report(key, report):
+    """Cache the report text (best effort)"""
+    try:
+        REPORT_CACHE_FILE.write_text(json.dumps({'key': key, 'report': report}), encoding='utf-8')
+    except OSError as e:
+        logger.debug(f"Could not cache report: {e}")
 
 def main():
     """Main entry point"""
+    # Unchanged trade history -> reprint the last report without recomputing
+    key = _report_cache_key() if TRADE_HISTORY_FILE.exists() else None
+    if key is not None:
+        report = _load_cached_report(key)
+        if report is not None:
+            logger.info("✓ Trade history unchanged - using cached report")
+            sys.stdout.write(report)
+            return
+    
     analytics = PerformanceAnalytics()
-    analytics.generate_summary()
+    report = analytics.generate_summary()
+    
+    if key is not None and report:
+        _save_cached_report(key, report)
 
 if __name__ == "__main__":
     try:
@@ -4,9 +4,26 @@ Backtesting Framework for Signal Bot
 Professional-grade backtesting following 12 best-practice principles.
 """
 
-from .config import BacktestConfig
-from .data_loader import HistoricalDataFetcher, BinanceDataLoader
-from .engine import BacktestEngine, Position, Trade
+from importlib import import_module
+
+# Public names -> defining submodule. Imported on first access so data tools
+# (downloader, availability checker) don't load the engine and live bot config.
+_EXPORTS = {
+    'BacktestConfig': 'config',
+    'HistoricalDataFetcher': 'data_loader',
+    'BinanceDataLoader': 'data_loader',
+    'BacktestEngine': 'engine',
+    'Position': 'engine',
+    'Trade': 'engine',
+    'ParallelBacktestOrchestrator': 'parallel',
+}
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(import_module(f'.{_EXPORTS[name]}', __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     'BacktestConfig',
@@ -14,5 +31,6 @@ __all__ = [
     'BinanceDataLoader',
     'BacktestEngine',
     'Position',
-    'Trade'
+    'Trade',
+    'ParallelBacktestOrchestrator'
 ]
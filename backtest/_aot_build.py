@@ -0,0 +1,62 @@
+"""
+Ahead-of-time build of the backtest kernels (numba.pycc)
+
+Compiles check_tp_sl_many and scan_tp_sl from backtest/_kernels.py into the
+extension module backtest/_bt_kernels. _kernels.py imports it when present, so
+backtests start without JIT compilation or cache loading.
+
+Usage (from the repo root, needs numba and a C compiler):
+    python -m backtest._aot_build
+
+The build records a hash of _kernels.py (exported as source_hash()); after
+editing _kernels.py the stale module is ignored, with a warning, until it is
+rebuilt. Set BACKTEST_JIT_ONLY=1 to ignore it altogether.
+"""
+
+import os
+import warnings
+from pathlib import Path
+
+# Build from the Python sources, not a previously compiled module
+os.environ['BACKTEST_JIT_ONLY'] = '1'
+
+from numba.core.errors import NumbaPendingDeprecationWarning
+from numba.pycc import CC
+
+from backtest import _kernels
+
+MODULE_NAME = '_bt_kernels'
+
+# Argument types as passed by BacktestEngine._update_positions
+SIGNATURES = {
+    'check_tp_sl_many': 'Tuple((i1[:], i1[:]))(i1[:], f8[:], f8[:], f8[:], f8[:], u1[:], f8[:], f8[:], b1)',
+    'scan_tp_sl': 'i8(i8, f8, f8, f8, f8, i8, f8[:], f8[:], i8, b1)',
+}
+
+# Source the kernels are compiled from, checked by _kernels.py on import
+SOURCE_HASH = _kernels.source_hash()
+
+def source_hash():
+    return SOURCE_HASH  # frozen in as a compile-time constant
+
+def build() -> Path:
+    """Compile the kernels into backtest/ and return the output directory"""
+    warnings.simplefilter('ignore', NumbaPendingDeprecationWarning)
+    
+    output_dir = Path(__file__).parent
+    cc = CC(MODULE_NAME)
+    cc.output_dir = str(output_dir)
+    
+    for name, signature in SIGNATURES.items():
+        cc.export(name, signature)(getattr(_kernels, name).py_func)
+    cc.export('source_hash', 'i8()')(source_hash)
+    
+    cc.compile()
+    return output_dir
+
+def main():
+    output_dir = build()
+    print(f"Compiled {MODULE_NAME} ({', '.join(SIGNATURES)}) into {output_dir}")
+
+if __name__ == '__main__':
+    main()
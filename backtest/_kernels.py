@@ -0,0 +1,166 @@
+"""
+Numeric kernels for the backtest engine's per-candle hot paths
+
+Compiled with numba when it is installed (cached to __pycache__, or to
+NUMBA_CACHE_DIR if set); otherwise the same functions run as plain Python.
+If the ahead-of-time build (python -m backtest._aot_build) is present and was
+built from this exact source, its check_tp_sl_many and scan_tp_sl are used
+instead, skipping JIT warmup.
+"""
+
+import hashlib
+import os
+import warnings
+from pathlib import Path
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Pure-Python stand-in for numba.njit (numba is optional)"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Direction codes
+LONG = 1
+SHORT = -1
+
+# Take profit flag bits
+TP1_BIT = 1
+TP2_BIT = 2
+TP3_BIT = 4
+
+# Stop loss outcomes
+SL_NONE = 0
+SL_HIT = 1
+SL_CONSERVATIVE = 2  # SL and a TP hit in the same candle, SL assumed first
+
+@njit(cache=True)
+def check_tp_sl(direction, sl, tp1, tp2, tp3, tp1_hit, tp2_hit, tp3_hit, high, low, conservative):
+    """
+    Check one candle against a position's stop and take profit levels
+    
+    TP levels only trigger in order (TP2 needs TP1 already hit, TP3 needs TP2).
+    
+    Returns:
+        (tp_level, sl_outcome) - highest TP level hit this candle (0 = none)
+        and one of SL_NONE / SL_HIT / SL_CONSERVATIVE. SL_CONSERVATIVE
+        always comes with tp_level 0.
+    """
+    if direction == LONG:
+        sl_hit = low <= sl
+        hit1 = not tp1_hit and high >= tp1
+        hit2 = not tp2_hit and tp1_hit and high >= tp2
+        hit3 = not tp3_hit and tp2_hit and high >= tp3
+    else:
+        sl_hit = high >= sl
+        hit1 = not tp1_hit and low <= tp1
+        hit2 = not tp2_hit and tp1_hit and low <= tp2
+        hit3 = not tp3_hit and tp2_hit and low <= tp3
+    
+    if conservative and sl_hit and (hit1 or hit2 or hit3):
+        return 0, SL_CONSERVATIVE
+    
+    if hit3:
+        tp_level = 3
+    elif hit2:
+        tp_level = 2
+    elif hit1:
+        tp_level = 1
+    else:
+        tp_level = 0
+    
+    return tp_level, (SL_HIT if sl_hit else SL_NONE)
+
+@njit(cache=True)
+def check_tp_sl_many(direction, sl, tp1, tp2, tp3, tp_flags, high, low, conservative):
+    """
+    check_tp_sl over parallel arrays of open positions (tp_flags as TP*_BIT masks)
+    
+    Returns:
+        (tp_levels, sl_outcomes) as int8 arrays aligned with the inputs
+    """
+    n = len(direction)
+    tp_levels = np.zeros(n, dtype=np.int8)
+    sl_outcomes = np.zeros(n, dtype=np.int8)
+    
+    for k in range(n):
+        tp_levels[k], sl_outcomes[k] = check_tp_sl(
+            direction[k], sl[k], tp1[k], tp2[k], tp3[k],
+            (tp_flags[k] & TP1_BIT) != 0,
+            (tp_flags[k] & TP2_BIT) != 0,
+            (tp_flags[k] & TP3_BIT) != 0,
+            high[k], low[k], conservative
+        )
+    
+    return tp_levels, sl_outcomes
+
+@njit(cache=True)
+def scan_tp_sl(direction, sl, tp1, tp2, tp3, tp_flags, high, low, start, conservative):
+    """
+    Index of the first candle from start on where check_tp_sl reports a TP or SL hit
+    
+    The position's levels are fixed until then, so no candle before it needs
+    checking. Returns len(high) if nothing hits before the data ends.
+    """
+    tp1_hit = (tp_flags & TP1_BIT) != 0
+    tp2_hit = (tp_flags & TP2_BIT) != 0
+    tp3_hit = (tp_flags & TP3_BIT) != 0
+    
+    for k in range(start, len(high)):
+        tp_level, sl_outcome = check_tp_sl(
+            direction, sl, tp1, tp2, tp3, tp1_hit, tp2_hit, tp3_hit, high[k], low[k], conservative
+        )
+        if tp_level or sl_outcome != SL_NONE:
+            return k
+    
+    return len(high)
+
+def source_hash() -> int:
+    """Hash of this file (first 8 bytes of its SHA-256, as int64), stamped into the AOT build"""
+    digest = hashlib.sha256(Path(__file__).read_bytes()).digest()
+    return int.from_bytes(digest[:8], 'little', signed=True)
+
+# Ahead-of-time compiled versions, if built from this source (BACKTEST_JIT_ONLY=1 ignores them)
+AOT_COMPILED = False
+if not os.environ.get('BACKTEST_JIT_ONLY'):
+    try:
+        from backtest import _bt_kernels
+    except ImportError:
+        _bt_kernels = None
+    
+    if _bt_kernels is not None:
+        built_from = getattr(_bt_kernels, 'source_hash', lambda: None)()
+        if built_from == source_hash():
+            check_tp_sl_many = _bt_kernels.check_tp_sl_many
+            scan_tp_sl = _bt_kernels.scan_tp_sl
+            AOT_COMPILED = True
+        else:
+            warnings.warn(
+                "backtest/_bt_kernels was built from a different _kernels.py and is ignored; "
+                "rebuild it with: python -m backtest._aot_build"
+            )
+
+def warm_up():
+    """
+    Compile (or load from cache) the JIT kernels now with tiny inputs of the
+    engine's argument types, so the first candles of a run don't pay for it
+    """
+    if not NUMBA_AVAILABLE or AOT_COMPILED:
+        return
+    
+    direction = np.array([LONG, SHORT], dtype=np.int8)
+    prices = np.ones(2)
+    tp_flags = np.zeros(2, dtype=np.uint8)
+    check_tp_sl_many(direction, prices, prices, prices, prices, tp_flags, prices, prices, True)
+    
+    # Candle arrays are read-only views under pandas copy-on-write (a separate specialization)
+    candles = prices.copy()
+    candles.flags.writeable = False
+    for highs_lows in (prices, candles):
+        scan_tp_sl(LONG, 1.0, 1.0, 1.0, 1.0, 0, highs_lows, highs_lows, 0, True)
@@ -14,21 +14,41 @@ Usage:
     symbols = checker.get_available_symbols_for_range('2024-01-01', '2024-12-31', ['5m', '15m', '4h'])
 """
 
+import json
+import os
 import re
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, NamedTuple, Tuple, Set
 from collections import defaultdict
-import pandas as pd
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from backtest.data_loader import DATA_FILE_SUFFIXES
+
+
+class DataFile(NamedTuple):
+    """One data file in the inventory"""
+    filepath: Path
+    start_date: datetime
+    end_date: datetime
+    start_str: str
+    end_str: str
+
+
+def _parse_yyyymmdd(date_str: str) -> datetime:
+    """Parse a YYYYMMDD string (much cheaper than strptime in the scan loop)"""
+    return datetime(int(date_str[0:4]), int(date_str[4:6]), int(date_str[6:8]))
+
 
 class DataAvailabilityChecker:
     """Check what data is available in the data_binance folder"""
     
+    # Parsed filename inventory, reused across runs for files whose mtime is unchanged
+    INVENTORY_CACHE_FILE = ".inventory.json"
+    
     def __init__(self, data_dir: str = None):
         """
         Initialize checker
@@ -46,41 +66,110 @@ class DataAvailabilityChecker:
                 "Run backtest/download_binance_data.py to download historical data"
             )
         
-        # Pattern: SYMBOL_TIMEFRAME_STARTDATE_ENDDATE.csv
-        # Example: BTCUSDT_15m_20210101_20260131.csv
+        # Pattern: SYMBOL_TIMEFRAME_STARTDATE_ENDDATE.parquet (or .csv)
+        # Example: BTCUSDT_15m_20210101_20260131.parquet
         self.file_pattern = re.compile(
-            r'^([A-Z]+USDT)_([0-9]+[mh])_(\d{8})_(\d{8})\.csv$'
+            r'^([A-Z]+USDT)_([0-9]+[mh])_(\d{8})_(\d{8})\.(?:parquet|csv)$'
         )
         
         self.data_inventory = None
+        self._range_cache: Dict[Tuple[str, str], Tuple[datetime, datetime]] = {}
         self._scan_data_directory()
     
+    def _load_inventory_cache(self) -> Dict[str, Dict]:
+        """Load cached filename inventory (empty if missing or unreadable)"""
+        cache_path = self.data_dir / self.INVENTORY_CACHE_FILE
+        try:
+            with open(cache_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_inventory_cache(self, cache: Dict[str, Dict]):
+        """Persist filename inventory (best effort - data dir may be read-only)"""
+        cache_path = self.data_dir / self.INVENTORY_CACHE_FILE
+        try:
+            with open(cache_path, 'w') as f:
+                json.dump(cache, f)
+        except OSError:
+            pass
+    
+    def _parse_filename(self, name: str):
+        """
+        Split SYMBOL_TIMEFRAME_STARTDATE_ENDDATE.<ext> into its parts
+        
+        Returns:
+            (symbol, timeframe, start_str, end_str) or None if not a data file
+        """
+        # Fast path: plain split, validated field by field
+        parts = name.rpartition('.')[0].rsplit('_', 3)
+        if len(parts) == 4:
+            symbol, timeframe, start_str, end_str = parts
+            if (len(start_str) == 8 and len(end_str) == 8 and
+                    start_str.isascii() and start_str.isdigit() and
+                    end_str.isascii() and end_str.isdigit() and
+                    timeframe[-1:] in ('m', 'h') and timeframe[:-1].isascii() and timeframe[:-1].isdigit() and
+                    symbol.endswith('USDT') and symbol.isascii() and symbol.isalpha() and symbol.isupper()):
+                return symbol, timeframe, start_str, end_str
+        
+        # Anything unusual goes through the full pattern
+        match = self.file_pattern.match(name)
+        return match.groups() if match else None
+    
     def _scan_data_directory(self):
         """Scan directory and build inventory of available data"""
         self.data_inventory = defaultdict(lambda: defaultdict(list))
         
-        for filepath in self.data_dir.glob("*.csv"):
-            match = self.file_pattern.match(filepath.name)
-            if not match:
-                continue
-            
-            symbol, timeframe, start_str, end_str = match.groups()
-            start_date = datetime.strptime(start_str, "%Y%m%d")
-            end_date = datetime.strptime(end_str, "%Y%m%d")
-            
-            self.data_inventory[symbol][timeframe].append({
-                'filepath': filepath,
-                'start_date': start_date,
-                'end_date': end_date,
-                'start_str': start_str,
-                'end_str': end_str
-            })
-        
-        # Sort by start date for each symbol/timeframe
+        cached = self._load_inventory_cache()
+        cache = {}
+        
+        with os.scandir(self.data_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(DATA_FILE_SUFFIXES):
+                    continue
+                
+                mtime = entry.stat().st_mtime_ns
+                record = cached.get(entry.name)
+                
+                # Only re-parse files that are new or changed since the last scan
+                if record is None or record['mtime'] != mtime:
+                    parsed = self._parse_filename(entry.name)
+                    if parsed is None:
+                        continue
+                    
+                    symbol, timeframe, start_str, end_str = parsed
+                    record = {
+                        'mtime': mtime,
+                        'symbol': symbol,
+                        'timeframe': timeframe,
+                        'start_str': start_str,
+                        'end_str': end_str
+                    }
+                
+                cache[entry.name] = record
+                
+                start_str = record['start_str']
+                end_str = record['end_str']
+                self.data_inventory[record['symbol']][record['timeframe']].append(DataFile(
+                    filepath=self.data_dir / entry.name,
+                    start_date=_parse_yyyymmdd(start_str),
+                    end_date=_parse_yyyymmdd(end_str),
+                    start_str=start_str,
+                    end_str=end_str
+                ))
+        
+        if cache != cached:
+            self._save_inventory_cache(cache)
+        
+        # Sort by start date for each symbol/timeframe and record its full date range
+        self._range_cache = {}
         for symbol in self.data_inventory:
             for timeframe in self.data_inventory[symbol]:
-                self.data_inventory[symbol][timeframe].sort(
-                    key=lambda x: x['start_date']
+                files = self.data_inventory[symbol][timeframe]
+                files.sort(key=lambda x: x.start_date)
+                self._range_cache[(symbol, timeframe)] = (
+                    files[0].start_date,
+                    max(f.end_date for f in files)
                 )
     
     def get_all_symbols(self) -> List[str]:
@@ -111,19 +200,7 @@ class DataAvailabilityChecker:
         Returns:
             (earliest_start, latest_end) or (None, None) if not found
         """
-        if symbol not in self.data_inventory:
-            return None, None
-        if timeframe not in self.data_inventory[symbol]:
-            return None, None
-        
-        files = self.data_inventory[symbol][timeframe]
-        if not files:
-            return None, None
-        
-        earliest_start = min(f['start_date'] for f in files)
-        latest_end = max(f['end_date'] for f in files)
-        
-        return earliest_start, latest_end
+        return self._range_cache.get((symbol, timeframe), (None, None))
     
     def has_coverage(
         self,
@@ -168,20 +245,27 @@ class DataAvailabilityChecker:
         Returns:
             List of symbols with complete coverage
         """
-        available = []
+        if not self._range_cache:
+            return []
         
-        for symbol in self.get_all_symbols():
-            has_all_timeframes = True
-            
-            for timeframe in timeframes:
-                if not self.has_coverage(symbol, timeframe, start_date, end_date):
-                    has_all_timeframes = False
-                    break
-            
-            if has_all_timeframes:
-                available.append(symbol)
+        # Imported here so the checker stays cheap to import for CLI tools
+        import pandas as pd
+        
+        ranges = pd.DataFrame(
+            [(symbol, tf, start, end) for (symbol, tf), (start, end) in self._range_cache.items()],
+            columns=['symbol', 'timeframe', 'start', 'end']
+        )
+        ranges['ok'] = (ranges['start'] <= start_date) & (ranges['end'] >= end_date)
+        
+        # Coverage matrix: rows = symbols (sorted), columns = timeframes
+        coverage = (
+            ranges.set_index(['symbol', 'timeframe'])['ok']
+            .unstack(fill_value=False)
+            .reindex(columns=timeframes, fill_value=False)
+        )
+        has_all_timeframes = coverage.all(axis=1)
         
-        return available
+        return has_all_timeframes[has_all_timeframes].index.tolist()
     
     def get_missing_data_report(
         self,
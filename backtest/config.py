@@ -2,14 +2,111 @@
 Backtesting configuration - imports from live trading config for consistency
 """
 from datetime import datetime, timedelta
+from functools import lru_cache
+import hashlib
+import json
+import os
 import sys
 from pathlib import Path
 
-# Import live bot config
-sys.path.insert(0, str(Path(__file__).parent.parent))
-from src.core.config import Config
+# Settings mirrored from the live bot Config (resolved on first access)
+LIVE_SETTINGS = (
+    'INITIAL_CAPITAL',
+    'HTF_TIMEFRAME',
+    'PRIMARY_TIMEFRAME',
+    'ENTRY_TIMEFRAME',
+    'SIGNAL_THRESHOLD_NORMAL',
+    'SIGNAL_THRESHOLD_DRAWDOWN',
+    'RISK_PER_TRADE',
+    'MAX_DAILY_LOSS',
+    'MAX_WEEKLY_LOSS',
+    'MAX_CONSECUTIVE_LOSSES',
+    'ADAPTIVE_STOP_ENABLED',
+    'ADAPTIVE_STOP_MIN_PROFIT_R',
+    'ADAPTIVE_STOP_VOLATILITY_SPIKE',
+    'ADAPTIVE_STOP_REGIME_CHANGE',
+    'ADAPTIVE_STOP_BREAKEVEN_BUFFER',
+    'ADAPTIVE_STOP_PARTIAL_PROTECTION',
+)
 
-class BacktestConfig:
+def _live_config():
+    """Import the live bot Config (only when a live setting is first needed)"""
+    root = str(Path(__file__).parent.parent)
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    from src.core.config import Config
+    return Config
+
+# Resolved symbol lists, persisted next to the data so short scripts skip the directory scan
+DATA_DIR_BINANCE = Path(__file__).parent / "data_binance"
+SYMBOLS_CACHE_FILE = DATA_DIR_BINANCE / ".symbols_cache.json"
+
+def _symbols_cache_key(start_date, end_date, timeframes):
+    return f"{start_date.isoformat()}|{end_date.isoformat()}|{','.join(timeframes)}"
+
+def _data_files_signature(suffixes) -> str:
+    """Hash of the data files' names and mtimes (cache files excluded, so writing them doesn't change it)"""
+    with os.scandir(DATA_DIR_BINANCE) as entries:
+        files = sorted(
+            (entry.name, entry.stat().st_mtime_ns)
+            for entry in entries
+            if entry.name.endswith(suffixes) and not entry.name.startswith('.')
+        )
+    return hashlib.sha256(json.dumps(files).encode()).hexdigest()
+
+@lru_cache(maxsize=None)
+def _available_symbols(start_date, end_date, timeframes):
+    """
+    Symbols with complete data for the range and timeframes (tuple)
+    
+    Memoized in-process, and on disk until a data file is added, removed,
+    renamed or rewritten.
+    """
+    from backtest.check_data_availability import DataAvailabilityChecker
+    from backtest.data_loader import DATA_FILE_SUFFIXES
+    
+    signature = _data_files_signature(DATA_FILE_SUFFIXES)
+    key = _symbols_cache_key(start_date, end_date, timeframes)
+    
+    try:
+        with open(SYMBOLS_CACHE_FILE, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    
+    if cache.get('data_files') != signature:
+        cache = {'data_files': signature, 'ranges': {}}
+    elif key in cache['ranges']:
+        return tuple(cache['ranges'][key])
+    
+    checker = DataAvailabilityChecker(DATA_DIR_BINANCE)
+    
+    symbols = checker.get_available_symbols_for_range(
+        start_date=start_date,
+        end_date=end_date,
+        timeframes=list(timeframes)
+    )
+    
+    cache['ranges'][key] = symbols
+    try:
+        with open(SYMBOLS_CACHE_FILE, 'w') as f:
+            json.dump(cache, f)
+    except OSError:
+        pass  # Best effort - data dir may be read-only
+    
+    return tuple(symbols)
+
+class _LiveConfigMeta(type):
+    """Resolve LIVE_SETTINGS from the live Config lazily, then cache them on the class"""
+    
+    def __getattr__(cls, name):
+        if name in LIVE_SETTINGS:
+            value = getattr(_live_config(), name)
+            setattr(cls, name, value)
+            return value
+        raise AttributeError(f"type object '{cls.__name__}' has no attribute '{name}'")
+
+class BacktestConfig(metaclass=_LiveConfigMeta):
     """Configuration for backtesting - inherits from live Config"""
     
     # ==================== BACKTEST PERIOD ====================
@@ -21,7 +118,7 @@ class BacktestConfig:
     END_DATE = datetime(2025, 8, 1)
     
     # ==================== INITIAL CONDITIONS ====================
-    INITIAL_CAPITAL = Config.INITIAL_CAPITAL  # Use live bot capital
+    # INITIAL_CAPITAL: live bot capital (from Config, see LIVE_SETTINGS)
     
     # ==================== EXECUTION SIMULATION ====================
     # Realistic execution parameters
@@ -44,82 +141,52 @@ class BacktestConfig:
     # Optional: Restrict to specific symbols (None = use all available)
     SYMBOL_FILTER = None  # e.g., ['BTCUSDT', 'ETHUSDT', 'SOLUSDT'] or None for all
     
-    # Cache for dynamically loaded symbols
-    _symbols_cache = None
-    
     @classmethod
     def get_symbols(cls):
         """Get list of symbols with complete data coverage for backtest period"""
-        # Return cached value if already computed
-        if cls._symbols_cache is not None:
-            return cls._symbols_cache
-        
         # If SYMBOLS is explicitly set (not None), use it
         if cls.SYMBOLS is not None:
-            cls._symbols_cache = cls.SYMBOLS
-            return cls._symbols_cache
+            return cls.SYMBOLS
         
-        # Dynamically determine available symbols
+        # Dynamically determine available symbols (cached per date range / timeframes)
         try:
-            from backtest.check_data_availability import DataAvailabilityChecker
-            checker = DataAvailabilityChecker()
-            
-            available_symbols = checker.get_available_symbols_for_range(
-                start_date=cls.START_DATE,
-                end_date=cls.END_DATE,
-                timeframes=[
-                    cls.HTF_TIMEFRAME,
-                    cls.PRIMARY_TIMEFRAME,
-                    cls.ENTRY_TIMEFRAME
-                ]
-            )
+            available_symbols = list(_available_symbols(
+                cls.START_DATE,
+                cls.END_DATE,
+                (cls.HTF_TIMEFRAME, cls.PRIMARY_TIMEFRAME, cls.ENTRY_TIMEFRAME)
+            ))
             
             # Apply filter if specified
             if cls.SYMBOL_FILTER is not None:
                 available_symbols = [s for s in cls.SYMBOL_FILTER if s in available_symbols]
             
-            cls._symbols_cache = available_symbols
-            return cls._symbols_cache
-            
+            return available_symbols
+        
         except Exception as e:
             # Fallback to a default list if checker fails
             print(f"Warning: Could not auto-detect symbols ({e}), using fallback list")
-            fallback = [
+            return [
                 'BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'XRPUSDT', 'BNBUSDT', 
                 'ADAUSDT', 'LINKUSDT', 'AVAXUSDT', 'DOGEUSDT', 'HBARUSDT',
                 'XLMUSDT', 'SUIUSDT'
             ]
-            cls._symbols_cache = fallback
-            return cls._symbols_cache
     
     # ==================== TIMEFRAMES ====================
-    # Must match live bot
-    HTF_TIMEFRAME = Config.HTF_TIMEFRAME
-    PRIMARY_TIMEFRAME = Config.PRIMARY_TIMEFRAME
-    ENTRY_TIMEFRAME = Config.ENTRY_TIMEFRAME
+    # Must match live bot: HTF_TIMEFRAME, PRIMARY_TIMEFRAME, ENTRY_TIMEFRAME
+    # (from Config, see LIVE_SETTINGS)
     
     # ==================== STRATEGY PARAMETERS ====================
-    # Import all strategy parameters from live config
-    SIGNAL_THRESHOLD_NORMAL = Config.SIGNAL_THRESHOLD_NORMAL
-    SIGNAL_THRESHOLD_DRAWDOWN = Config.SIGNAL_THRESHOLD_DRAWDOWN
+    # Strategy parameters come from live config:
+    # SIGNAL_THRESHOLD_NORMAL, SIGNAL_THRESHOLD_DRAWDOWN
     
     # ==================== RISK MANAGEMENT ====================
-    # Use same parameters as live bot
-    RISK_PER_TRADE = Config.RISK_PER_TRADE
-    MAX_DAILY_LOSS = Config.MAX_DAILY_LOSS
-    MAX_WEEKLY_LOSS = Config.MAX_WEEKLY_LOSS
-    MAX_CONSECUTIVE_LOSSES = Config.MAX_CONSECUTIVE_LOSSES
+    # Same parameters as live bot (from Config): RISK_PER_TRADE, MAX_DAILY_LOSS,
+    # MAX_WEEKLY_LOSS, MAX_CONSECUTIVE_LOSSES
     MAX_TOTAL_ACTIVE_SIGNALS = 4  # Same as live bot
     COOLDOWN_HOURS = 12  # After max consecutive losses
     
     # ==================== ADAPTIVE STOP PARAMETERS ====================
-    # Import adaptive stop settings from live config
-    ADAPTIVE_STOP_ENABLED = Config.ADAPTIVE_STOP_ENABLED
-    ADAPTIVE_STOP_MIN_PROFIT_R = Config.ADAPTIVE_STOP_MIN_PROFIT_R
-    ADAPTIVE_STOP_VOLATILITY_SPIKE = Config.ADAPTIVE_STOP_VOLATILITY_SPIKE
-    ADAPTIVE_STOP_REGIME_CHANGE = Config.ADAPTIVE_STOP_REGIME_CHANGE
-    ADAPTIVE_STOP_BREAKEVEN_BUFFER = Config.ADAPTIVE_STOP_BREAKEVEN_BUFFER
-    ADAPTIVE_STOP_PARTIAL_PROTECTION = Config.ADAPTIVE_STOP_PARTIAL_PROTECTION
+    # Adaptive stop settings come from live config (all ADAPTIVE_STOP_* in LIVE_SETTINGS)
     
     # ==================== WALK-FORWARD TESTING ====================
     # Split data for validation
@@ -128,6 +195,9 @@ class BacktestConfig:
     
     ENABLE_WALK_FORWARD = False  # Disabled by default
     
+    # Run the train and test backtests side by side in two processes (needs 2+ cores)
+    PARALLEL_WALK_FORWARD = (os.cpu_count() or 1) > 1
+    
     # ==================== LOGGING ====================
     ENABLE_LOGGING = False  # Set to False to disable all logging for faster backtest
     LOG_LEVEL = 'INFO'  # 'DEBUG' for detailed candle-by-candle
@@ -140,6 +210,15 @@ class BacktestConfig:
     RESULTS_DIR = 'backtest/results'
     DATA_DIR = 'backtest/data'
     
+    # Reuse results of identical runs (same data, config and strategy code)
+    CACHE_RESULTS = True
+    RESULT_CACHE_DIR = Path.home() / '.cache' / 'crypto-signal-bot' / 'backtests'
+    
+    # Processes computing indicators for the loaded frames (1 = in-process). Off by
+    # default: pickling frames out and columns back only pays off for long, many-symbol
+    # runs. BACKTEST_WORKERS sizes the separate per-symbol pool (ParallelBacktestOrchestrator)
+    INDICATOR_WORKERS = int(os.environ.get('BACKTEST_INDICATOR_WORKERS', 1))
+    
     @classmethod
     def get_date_range_string(cls):
         """Get formatted date range for filenames"""
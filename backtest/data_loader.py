@@ -1,17 +1,147 @@
 """
-Load historical data from Binance CSV files for backtesting
+Load historical data from Binance data files for backtesting
 
-Replaces the old Bitget API data fetcher with static historical data
+Replaces the old Bitget API data fetcher with static historical data.
+Files are Parquet (written by download_binance_data.py); CSV files from
+older downloads are still read. When the downloader has also built a
+per-timeframe Arrow store (ohlcv_<timeframe>.arrow), symbols are sliced
+out of its memory map instead of parsing one file each.
 """
 
+import json
+import os
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from multiprocessing import shared_memory
 from pathlib import Path
 from loguru import logger
-from datetime import datetime
-from typing import Dict, List
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# Data file formats (Parquet from the downloader, CSV from older downloads)
+DATA_FILE_SUFFIXES = ('.parquet', '.csv')
+
+# Rows per chunk when scanning legacy CSV files
+CSV_CHUNK_ROWS = 100_000
+
+# Per-timeframe Arrow IPC store of all symbols (written by download_binance_data.py)
+STORE_PREFIX = 'ohlcv_'
+STORE_SUFFIX = '.arrow'
+
+
+def _file_date_range(stem: str) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Parse STARTDATE/ENDDATE from SYMBOL_TIMEFRAME_STARTDATE_ENDDATE"""
+    try:
+        start_str, end_str = stem.rsplit('_', 2)[-2:]
+        return datetime.strptime(start_str, '%Y%m%d'), datetime.strptime(end_str, '%Y%m%d')
+    except ValueError:
+        return None, None
+
+
+def _timeframe_delta(timeframe: str) -> timedelta:
+    """Bar length of a Binance interval string ('5m', '4h', '1d', '1w')"""
+    units = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+    return timedelta(**{units[timeframe[-1]]: int(timeframe[:-1])})
+
+
+def _warmup_start(start_date: Optional[datetime], timeframe: str, warmup_bars: int) -> Optional[datetime]:
+    """Move start_date back by warmup_bars bars of the timeframe"""
+    if start_date is None or not warmup_bars:
+        return start_date
+    return start_date - warmup_bars * _timeframe_delta(timeframe)
+
+
+def _slice_range(df: pd.DataFrame, start_date: datetime = None, end_date: datetime = None) -> pd.DataFrame:
+    """Rows of a time-sorted frame within [start_date, end_date], by binary search (no mask)"""
+    lo = 0 if start_date is None else df.index.searchsorted(start_date, side='left')
+    hi = len(df) if end_date is None else df.index.searchsorted(end_date, side='right')
+    return df.iloc[lo:hi]
+
+
+def _read_parquet(filepath: Path, start_date: datetime = None, end_date: datetime = None) -> pd.DataFrame:
+    """Read OHLCV columns, letting pyarrow skip row groups outside the date range"""
+    filters = []
+    if start_date is not None:
+        filters.append(('timestamp', '>=', pd.Timestamp(start_date)))
+    if end_date is not None:
+        filters.append(('timestamp', '<=', pd.Timestamp(end_date)))
+    
+    df = pd.read_parquet(filepath, columns=OHLCV_COLUMNS, filters=filters or None)
+    
+    # Files saved before float64 storage hold float32; compute in float64 like the CSV path
+    return df.astype('float64')
+
+
+def _read_csv(filepath: Path, start_date: datetime = None, end_date: datetime = None) -> pd.DataFrame:
+    """Read a time-sorted CSV in chunks, stopping once past end_date"""
+    chunks = []
+    
+    with pd.read_csv(filepath, index_col=0, parse_dates=True, chunksize=CSV_CHUNK_ROWS) as reader:
+        for chunk in reader:
+            if end_date is not None and chunk.index[0] > end_date:
+                break
+            
+            chunk = _slice_range(chunk, start_date, end_date)
+            if not chunk.empty:
+                chunks.append(chunk)
+    
+    if not chunks:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    
+    return pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+
+
+def _read_data_file(filepath: Path, start_date: datetime = None, end_date: datetime = None) -> pd.DataFrame:
+    """Read one data file for the date range (top-level so worker processes can run it)"""
+    if filepath.suffix == '.parquet':
+        return _read_parquet(filepath, start_date, end_date)
+    return _read_csv(filepath, start_date, end_date)
+
+
+# Parsed frames by (file, mtime, start, end), so repeat loads in one process
+# (walk-forward splits, parameter sweeps) skip parsing; a re-download changes mtime
+_frame_cache: 'OrderedDict[tuple, pd.DataFrame]' = OrderedDict()
+FRAME_CACHE_SIZE = 64
+PANDAS_MAJOR = int(pd.__version__.split('.')[0])
+
+
+def _frame_cache_key(filepath: Path, start_date: datetime = None, end_date: datetime = None) -> tuple:
+    return (str(filepath), filepath.stat().st_mtime_ns, start_date, end_date)
+
+
+def _copy_on_write() -> bool:
+    """Whether pandas copy-on-write is on (always on pandas 3, opt-in on pandas 2)"""
+    return PANDAS_MAJOR >= 3 or pd.options.mode.copy_on_write is True
+
+
+def _get_cached_frame(key: tuple) -> Optional[pd.DataFrame]:
+    df = _frame_cache.get(key)
+    if df is None:
+        return None
+    _frame_cache.move_to_end(key)
+    # Under copy-on-write a shallow copy keeps caller edits out of the cached
+    # frame; without it, in-place .loc/.iloc writes would reach the cache
+    return df.copy(deep=not _copy_on_write())
+
+
+def _put_cached_frame(key: tuple, df: pd.DataFrame):
+    _frame_cache[key] = df
+    _frame_cache.move_to_end(key)
+    while len(_frame_cache) > FRAME_CACHE_SIZE:
+        _frame_cache.popitem(last=False)
+
 
 class BinanceDataLoader:
-    """Load historical data from downloaded Binance CSV files"""
+    """Load historical data from downloaded Binance data files"""
+    
+    # Worker processes for load_all_data (file parsing is CPU bound)
+    MAX_WORKERS = os.cpu_count() or 1
     
     def __init__(self, data_dir: str = None):
         if data_dir is None:
@@ -23,6 +153,42 @@ class BinanceDataLoader:
                 f"Data directory not found: {self.data_dir}\n"
                 "Run backtest/download_binance_data.py to download historical data"
             )
+        
+        self._index, self._stores = self._build_index()
+        self._store_tables = {}
+    
+    def _build_index(self):
+        """
+        Index data files by (symbol, timeframe) with one directory scan
+        
+        Returns:
+            (index, stores): index maps (symbol, timeframe) to (is_csv, start, end, path)
+            entries for SYMBOL_TIMEFRAME_STARTDATE_ENDDATE.<ext> files (start/end None when
+            the name carries no date range); stores maps timeframe to its Arrow store
+        """
+        index = defaultdict(list)
+        stores = {}
+        
+        with os.scandir(self.data_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith(STORE_PREFIX) and entry.name.endswith(STORE_SUFFIX):
+                    stores[entry.name[len(STORE_PREFIX):-len(STORE_SUFFIX)]] = Path(entry.path)
+                    continue
+                
+                stem, dot, ext = entry.name.rpartition('.')
+                if not dot or '.' + ext not in DATA_FILE_SUFFIXES:
+                    continue
+                
+                parts = stem.split('_', 2)
+                if len(parts) < 3:
+                    continue
+                
+                file_start, file_end = _file_date_range(stem)
+                index[(parts[0], parts[1])].append(
+                    (ext == 'csv', file_start, file_end, Path(entry.path))
+                )
+        
+        return dict(index), stores
     
     def _log(self, level: str, message: str):
         """Log message if logging is enabled"""
@@ -37,12 +203,86 @@ class BinanceDataLoader:
             elif level == 'error':
                 logger.error(message)
     
-    def load_symbol_data(
+    def _find_data_file(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date: datetime = None,
+        end_date: datetime = None
+    ) -> Optional[Path]:
+        """
+        Pick the data file for a symbol/timeframe whose embedded
+        STARTDATE_ENDDATE range overlaps the requested window
+        (Parquet preferred, then earliest range first)
+        """
+        candidates = []
+        
+        for is_csv, file_start, file_end, filepath in self._index.get((symbol, timeframe), ()):
+            if file_start is not None:
+                # End date is the day of the last candle, so it covers that whole day
+                if end_date is not None and file_start > end_date:
+                    continue
+                if start_date is not None and file_end + timedelta(days=1) <= start_date:
+                    continue
+            
+            candidates.append((is_csv, file_start or datetime.min, filepath))
+        
+        if not candidates:
+            return None
+        
+        return min(candidates)[2]
+    
+    def _read_from_store(
         self,
         symbol: str,
         timeframe: str,
+        filepath: Path,
         start_date: datetime = None,
         end_date: datetime = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Slice a symbol out of the memory-mapped timeframe store
+        
+        Returns None (read the file instead) when there is no store, or when the
+        store was not built from the same file load_symbol_data would read, or from
+        an older version of it (mtime or size changed since the store was built).
+        """
+        if timeframe not in self._store_tables:
+            table = None
+            if timeframe in self._stores:
+                with pa.memory_map(str(self._stores[timeframe])) as source:
+                    table = pa.ipc.open_file(source).read_all()
+            self._store_tables[timeframe] = table
+        
+        table = self._store_tables[timeframe]
+        if table is None:
+            return None
+        
+        entry = json.loads(table.schema.metadata[b'symbols']).get(symbol)
+        if entry is None or entry['file'] != filepath.name:
+            return None
+        
+        stat = filepath.stat()
+        if entry.get('mtime_ns') != stat.st_mtime_ns or entry.get('size') != stat.st_size:
+            return None
+        
+        # Rows are grouped by symbol and time-sorted, so the range is two binary searches
+        rows = table.slice(entry['offset'], entry['length'])
+        timestamps = rows.column('timestamp').to_numpy()
+        lo = 0 if start_date is None else np.searchsorted(timestamps, np.datetime64(start_date), side='left')
+        hi = len(timestamps) if end_date is None else np.searchsorted(timestamps, np.datetime64(end_date), side='right')
+        rows = rows.slice(lo, hi - lo).select(['timestamp'] + OHLCV_COLUMNS)
+        
+        # Stores built from older float32 files; compute in float64 like the CSV path
+        return rows.to_pandas().set_index('timestamp').astype('float64')
+    
+    def load_symbol_data(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        warmup_bars: int = 0
     ) -> pd.DataFrame:
         """
         Load historical data for a symbol and timeframe
@@ -52,32 +292,28 @@ class BinanceDataLoader:
             timeframe: Interval (e.g., '5m', '15m', '4h')
             start_date: Optional start date filter
             end_date: Optional end date filter
+            warmup_bars: Extra bars to include before start_date (indicator warmup)
         
         Returns:
             DataFrame with OHLCV data
         """
-        # Find matching file
-        pattern = f"{symbol}_{timeframe}_*.csv"
-        files = list(self.data_dir.glob(pattern))
+        start_date = _warmup_start(start_date, timeframe, warmup_bars)
+        
+        filepath = self._find_data_file(symbol, timeframe, start_date, end_date)
         
-        if not files:
+        if filepath is None:
             self._log('warning', f"No data file found for {symbol} {timeframe}")
             return pd.DataFrame()
         
-        # Use the first matching file (should only be one)
-        filepath = files[0]
-        
         self._log('debug', f"Loading {filepath.name}")
         
-        # Read CSV
-        df = pd.read_csv(filepath, index_col=0, parse_dates=True)
-        
-        # Filter by date range if specified
-        if start_date is not None:
-            df = df[df.index >= start_date]
-        
-        if end_date is not None:
-            df = df[df.index <= end_date]
+        df = self._read_from_store(symbol, timeframe, filepath, start_date, end_date)
+        if df is None:
+            key = _frame_cache_key(filepath, start_date, end_date)
+            df = _get_cached_frame(key)
+            if df is None:
+                df = _read_data_file(filepath, start_date, end_date)
+                _put_cached_frame(key, df.copy(deep=False))
         
         self._log('debug', f"Loaded {len(df)} candles for {symbol} {timeframe}")
         
@@ -88,7 +324,8 @@ class BinanceDataLoader:
         symbols: List[str],
         timeframes: List[str],
         start_date: datetime = None,
-        end_date: datetime = None
+        end_date: datetime = None,
+        warmup_bars: int = 0
     ) -> Dict[str, Dict[str, pd.DataFrame]]:
         """
         Load data for multiple symbols and timeframes
@@ -98,10 +335,47 @@ class BinanceDataLoader:
             timeframes: List of intervals
             start_date: Optional start date filter
             end_date: Optional end date filter
+            warmup_bars: Extra bars to include before start_date, per timeframe
         
         Returns:
             Dict[symbol][timeframe] = DataFrame
         """
+        # Resolve files up front; slice what the timeframe stores cover, parse the rest across processes
+        frames = {}
+        files = {}
+        for symbol in symbols:
+            for timeframe in timeframes:
+                tf_start = _warmup_start(start_date, timeframe, warmup_bars)
+                filepath = self._find_data_file(symbol, timeframe, tf_start, end_date)
+                if filepath is None:
+                    continue
+                
+                df = self._read_from_store(symbol, timeframe, filepath, tf_start, end_date)
+                if df is None:
+                    df = _get_cached_frame(_frame_cache_key(filepath, tf_start, end_date))
+                
+                if df is None:
+                    files[(symbol, timeframe)] = (filepath, tf_start)
+                else:
+                    frames[(symbol, timeframe)] = df
+        
+        workers = min(self.MAX_WORKERS, len(files))
+        
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(_read_data_file, filepath, tf_start, end_date): key
+                    for key, (filepath, tf_start) in files.items()
+                }
+                for future in as_completed(futures):
+                    frames[futures[future]] = future.result()
+        else:
+            for key, (filepath, tf_start) in files.items():
+                frames[key] = _read_data_file(filepath, tf_start, end_date)
+        
+        for key, (filepath, tf_start) in files.items():
+            _put_cached_frame(_frame_cache_key(filepath, tf_start, end_date), frames[key].copy(deep=False))
+        
         all_data = {}
         
         for symbol in symbols:
@@ -109,22 +383,111 @@ class BinanceDataLoader:
             all_data[symbol] = {}
             
             for timeframe in timeframes:
-                df = self.load_symbol_data(
-                    symbol=symbol,
-                    timeframe=timeframe,
-                    start_date=start_date,
-                    end_date=end_date
-                )
+                df = frames.get((symbol, timeframe))
                 
-                if not df.empty:
+                if df is None:
+                    self._log('warning', f"No data file found for {symbol} {timeframe}")
+                elif not df.empty:
                     all_data[symbol][timeframe] = df
                     self._log('info', f"  {timeframe}: {len(df)} candles")
-                else:
-                    self._log('warning', f"  {timeframe}: No data")
+                    continue
+                
+                self._log('warning', f"  {timeframe}: No data")
         
         return all_data
 
 
+class SharedDataSet:
+    """
+    OHLCV frames from load_all_data packed into one shared memory block
+    
+    Lets parallel backtest workers use a single copy of the data instead of each
+    loading its own: the parent builds a SharedDataSet and passes `handle` (small,
+    picklable) to workers, which call SharedDataSet.attach(handle). Each frame is
+    stored column by column (timestamps, then OHLCV as float64), so workers get
+    DataFrames that view the shared buffer without copying. Attached frames are
+    read-only.
+    
+    The parent must keep the SharedDataSet alive while workers run, then call unlink().
+    """
+    
+    def __init__(self, all_data: Dict[str, Dict[str, pd.DataFrame]]):
+        layout = {}
+        offset = 0
+        for symbol, frames in all_data.items():
+            layout[symbol] = {}
+            for timeframe, df in frames.items():
+                layout[symbol][timeframe] = (offset, len(df), str(df.index.dtype))
+                offset += len(df) * 8 * (1 + len(OHLCV_COLUMNS))
+        
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.handle = (self.shm.name, layout)
+        
+        for symbol, frames in all_data.items():
+            for timeframe, df in frames.items():
+                timestamps, values = self._views(self.shm.buf, *layout[symbol][timeframe])
+                timestamps[:] = df.index.values
+                values[:] = df[OHLCV_COLUMNS].to_numpy(dtype='float64').T
+    
+    @staticmethod
+    def _views(buf, offset: int, rows: int, index_dtype: str):
+        """(timestamps, values[column, row]) arrays over one frame's slot in the block"""
+        timestamps = np.ndarray(rows, dtype=index_dtype, buffer=buf, offset=offset)
+        values = np.ndarray(
+            (len(OHLCV_COLUMNS), rows), dtype='float64', buffer=buf, offset=offset + rows * 8
+        )
+        return timestamps, values
+    
+    @classmethod
+    def attach(cls, handle) -> Tuple[shared_memory.SharedMemory, Dict[str, Dict[str, pd.DataFrame]]]:
+        """
+        Rebuild the all_data dict from a handle (in a worker process)
+        
+        Returns:
+            (shm, all_data) - keep shm referenced while the frames are in use
+        """
+        name, layout = handle
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:  # Python < 3.13 has no track argument
+            shm = shared_memory.SharedMemory(name=name)
+        
+        all_data = {}
+        for symbol, frames in layout.items():
+            all_data[symbol] = {}
+            for timeframe, slot in frames.items():
+                timestamps, values = cls._views(shm.buf, *slot)
+                timestamps.flags.writeable = False
+                values.flags.writeable = False
+                all_data[symbol][timeframe] = pd.DataFrame(
+                    values.T,
+                    index=pd.DatetimeIndex(timestamps, name='timestamp', copy=False),
+                    columns=OHLCV_COLUMNS,
+                    copy=False
+                )
+        
+        return shm, all_data
+    
+    @classmethod
+    @contextmanager
+    def attached(cls, handle):
+        """attach() for the duration of a with block, closing the mapping afterwards"""
+        shm, all_data = cls.attach(handle)
+        try:
+            yield all_data
+        finally:
+            del all_data
+            try:
+                shm.close()
+            except BufferError:
+                pass  # Frames still referenced - the mapping goes away with the process
+    
+    def unlink(self):
+        """Release the block (parent process, after all workers are done)"""
+        self.shm.close()
+        self.shm.unlink()
+
+
 # For backward compatibility with existing backtest scripts
 class HistoricalDataFetcher:
     """Compatibility wrapper - now loads from Binance files instead of fetching from API"""
@@ -141,7 +504,8 @@ class HistoricalDataFetcher:
         start_date: datetime,
         end_date: datetime,
         timeframes: list,
-        force_refresh: bool = False
+        force_refresh: bool = False,
+        warmup_bars: int = 0
     ) -> dict:
         """Load data (compatible with old API)"""
         from backtest.config import BacktestConfig
@@ -152,7 +516,8 @@ class HistoricalDataFetcher:
             symbols=symbols,
             timeframes=timeframes,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            warmup_bars=warmup_bars
         )
     
     def fetch_all_symbols(
@@ -5,26 +5,198 @@ https://data.binance.vision/
 This script downloads intraday historical data for backtesting
 """
 
+import json
+import sys
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from pathlib import Path
 from datetime import datetime, timedelta
 from loguru import logger
 import zipfile
-import io
+import tempfile
 from typing import List
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path for imports (run as a script)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backtest.data_loader import OHLCV_COLUMNS
+
+# Binance kline CSV columns (only the first six are parsed)
+KLINE_COLUMNS = [
+    'open_time', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_volume', 'trades', 'taker_buy_base',
+    'taker_buy_quote', 'ignore'
+]
+KLINE_ARROW_TYPES = {'open_time': pa.int64(), **{col: pa.float64() for col in OHLCV_COLUMNS}}
 
 class BinanceDataDownloader:
     """Download historical klines from Binance Data Vision"""
     
     BASE_URL = "https://data.binance.vision/data"
     
+    # Concurrent monthly downloads
+    MAX_WORKERS = 8
+    
+    # No fixed delay between requests. Connection errors and 5xx are retried per request
+    # by the session adapter; a 429 or a used-weight header near the limit makes all
+    # threads back off together
+    MAX_RETRIES = 5
+    USED_WEIGHT_LIMIT = 1000  # X-MBX-USED-WEIGHT-1M (limit is 1200/min)
+    
+    # Downloaded archives stay in memory up to this size, larger ones spill to disk
+    SPOOL_MAX_BYTES = 64 * 1024 * 1024
+    
+    # Parquet row group size - small enough that date-filtered reads skip most of the file
+    PARQUET_ROW_GROUP_SIZE = 10_000
+    
+    # All symbols of one interval in a single memory-mappable Arrow file (see data_loader.py)
+    STORE_FILENAME = "ohlcv_{interval}.arrow"
+    
     def __init__(self):
         self.output_dir = Path("backtest/data_binance")
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.temp_dir = Path("backtest/data_binance/temp")
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        
+        # One Parquet shard per downloaded month, so re-runs only fetch what's missing
+        self.raw_dir = self.output_dir / "raw"
+        
+        # Shared session keeps connections alive between requests (one per worker)
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=self.MAX_WORKERS,
+            pool_maxsize=self.MAX_WORKERS,
+            max_retries=Retry(
+                total=self.MAX_RETRIES,
+                backoff_factor=0.5,
+                status_forcelist=[500, 502, 503, 504],
+                allowed_methods=['GET', 'HEAD'],
+                raise_on_status=False
+            )
+        ))
+        
+        # Backoff state (shared by worker threads)
+        self._backoff_lock = threading.Lock()
+        self._backoff_until = 0.0
+    
+    def _back_off(self, seconds: float):
+        """Hold off all threads for at least `seconds`"""
+        with self._backoff_lock:
+            self._backoff_until = max(self._backoff_until, time.monotonic() + seconds)
+    
+    def _get(self, url: str, stream: bool = False) -> requests.Response:
+        """GET with 429-driven exponential backoff shared by all threads (no delay on success)"""
+        for attempt in range(self.MAX_RETRIES):
+            with self._backoff_lock:
+                wait = self._backoff_until - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            
+            response = self.session.get(url, timeout=30, stream=stream)
+            
+            used_weight = response.headers.get('X-MBX-USED-WEIGHT-1M')
+            if used_weight is not None and int(used_weight) >= self.USED_WEIGHT_LIMIT:
+                self._back_off(1.0)
+            
+            if response.status_code != 429:
+                return response
+            
+            retry_after = response.headers.get('Retry-After')
+            delay = float(retry_after) if retry_after else 2 ** attempt
+            logger.debug(f"HTTP {response.status_code} for {url}, backing off {delay:.0f}s")
+            self._back_off(delay)
+            if attempt < self.MAX_RETRIES - 1:
+                response.close()
+        
+        return response
+    
+    def _monthly_url(self, symbol: str, interval: str, year: int, month: int, market_type: str) -> str:
+        """URL of a monthly klines archive on Binance Data Vision"""
+        filename = f"{symbol}-{interval}-{year}-{month:02d}.zip"
+        if market_type == "futures":
+            return f"{self.BASE_URL}/futures/um/monthly/klines/{symbol}/{interval}/{filename}"
+        return f"{self.BASE_URL}/spot/monthly/klines/{symbol}/{interval}/{filename}"
+    
+    def _has_month(self, symbol: str, interval: str, year: int, month: int, market_type: str) -> bool:
+        """HEAD one monthly archive; only a clear 404 counts as missing"""
+        url = self._monthly_url(symbol, interval, year, month, market_type)
+        try:
+            response = self.session.head(url, timeout=30, allow_redirects=True)
+        except requests.exceptions.RequestException:
+            return True
+        
+        return response.status_code != 404
+    
+    def probe(self, symbol: str, interval: str, start_year: int, end_date: datetime, market_type: str = "spot") -> bool:
+        """
+        Check whether the market has the symbol, with a few HEAD requests
+        
+        Looks for the last complete month up to end_date first. A 404 there is
+        inconclusive - the archive for a month that just ended is published a day
+        or more later, and delisted symbols stop before end_date - so the month
+        before it and the first month of the range are tried too. Returns False
+        only if all of them 404; network errors fall through to the normal
+        month-by-month download.
+        """
+        year, month = end_date.year, end_date.month
+        if datetime(year + month // 12, month % 12 + 1, 1) > datetime.now():
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        
+        candidates = [
+            (year, month),
+            (year, month - 1) if month > 1 else (year - 1, 12),
+            (start_year, 1)
+        ]
+        
+        return any(
+            self._has_month(symbol, interval, y, m, market_type)
+            for y, m in dict.fromkeys(candidates)
+            if (y, m) >= (start_year, 1)
+        )
+    
+    def _read_kline_csv(self, z: zipfile.ZipFile, csv_filename: str) -> pd.DataFrame:
+        """Parse open time + OHLCV from a kline CSV in the archive"""
+        with z.open(csv_filename) as f:
+            # Newer files start with a header row, older ones go straight to data
+            has_header = not f.peek(1)[:1].isdigit()
+        
+        read_kwargs = dict(
+            header=None,
+            names=KLINE_COLUMNS,
+            usecols=range(6),
+            skiprows=1 if has_header else 0
+        )
+        
+        try:
+            # Arrow's reader parses blocks on all cores, straight into typed columns
+            with z.open(csv_filename) as f:
+                table = pa_csv.read_csv(
+                    f,
+                    read_options=pa_csv.ReadOptions(
+                        column_names=KLINE_COLUMNS,
+                        skip_rows=1 if has_header else 0,
+                        use_threads=True
+                    ),
+                    convert_options=pa_csv.ConvertOptions(
+                        include_columns=KLINE_COLUMNS[:6],
+                        column_types=KLINE_ARROW_TYPES
+                    )
+                )
+            return table.to_pandas()
+        except ValueError:  # includes pyarrow.ArrowInvalid
+            # Malformed values: read as text, coerce in one pass, drop the bad rows once
+            logger.debug(f"Malformed values in {csv_filename}, dropping unparseable rows")
+            with z.open(csv_filename) as f:
+                df = pd.read_csv(f, dtype=str, **read_kwargs)
+            df = df.apply(pd.to_numeric, errors='coerce').dropna(subset=OHLCV_COLUMNS)
+            return df.astype({col: 'float64' for col in OHLCV_COLUMNS})
     
     def download_monthly_klines(
         self,
@@ -51,67 +223,62 @@ class BinanceDataDownloader:
         # Most are like BTCUSDT, but need to check
         
         month_str = f"{month:02d}"
-        filename = f"{symbol}-{interval}-{year}-{month_str}.zip"
-        
-        if market_type == "futures":
-            url = f"{self.BASE_URL}/futures/um/monthly/klines/{symbol}/{interval}/{filename}"
-        else:
-            url = f"{self.BASE_URL}/spot/monthly/klines/{symbol}/{interval}/{filename}"
+        url = self._monthly_url(symbol, interval, year, month, market_type)
+        
+        # Reuse a cached month unless it was saved before the month was over
+        shard = self.raw_dir / market_type / symbol / interval / f"{year}-{month_str}.parquet"
+        month_end = datetime(year + month // 12, month % 12 + 1, 1)
+        if shard.exists() and datetime.fromtimestamp(shard.stat().st_mtime) >= month_end:
+            df = pd.read_parquet(shard)
+            # Older shards were rounded to float32 - fetch those again at full precision
+            if (df.dtypes == 'float64').all():
+                logger.debug(f"Cached: {shard}")
+                return df
+            logger.debug(f"Re-downloading float32 shard: {shard}")
         
         logger.debug(f"Attempting: {url}")
         
         try:
-            response = requests.get(url, timeout=30)
-            
-            if response.status_code == 404:
-                logger.debug(f"Not found: {year}-{month_str} ({market_type})")
-                return None
-            
-            response.raise_for_status()
-            
-            # Extract ZIP file
-            with zipfile.ZipFile(io.BytesIO(response.content)) as z:
-                csv_filename = f"{symbol}-{interval}-{year}-{month_str}.csv"
-                with z.open(csv_filename) as f:
-                    # Try reading with header first, then without
-                    df = pd.read_csv(f, header=None)
-            
-            # Check if first row contains header strings (not numeric)
-            if df.iloc[0, 0] == 'open_time' or not str(df.iloc[0, 0]).isdigit():
-                # Skip header row
-                df = df.iloc[1:].reset_index(drop=True)
+            # Stream the archive into a spool (memory up to SPOOL_MAX_BYTES, then disk)
+            # instead of holding response.content plus a BytesIO copy of it
+            with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_BYTES) as spool:
+                with self._get(url, stream=True) as response:
+                    if response.status_code == 404:
+                        logger.debug(f"Not found: {year}-{month_str} ({market_type})")
+                        return None
+                    
+                    response.raise_for_status()
+                    
+                    for chunk in response.iter_content(chunk_size=1 << 20):
+                        spool.write(chunk)
+                
+                spool.seek(0)
+                
+                # Extract ZIP file
+                with zipfile.ZipFile(spool) as z:
+                    df = self._read_kline_csv(z, f"{symbol}-{interval}-{year}-{month_str}.csv")
             
             # Binance klines format:
             # 0: Open time, 1: Open, 2: High, 3: Low, 4: Close, 5: Volume,
             # 6: Close time, 7: Quote asset volume, 8: Number of trades,
             # 9: Taker buy base volume, 10: Taker buy quote volume, 11: Ignore
             
-            df.columns = [
-                'open_time', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-                'taker_buy_quote', 'ignore'
-            ]
-            
-            # Convert timestamp to datetime (ensure open_time is numeric)
-            df['open_time'] = pd.to_numeric(df['open_time'], errors='coerce')
-            df['timestamp'] = pd.to_datetime(df['open_time'], unit='ms', errors='coerce')
-            df.set_index('timestamp', inplace=True)
-            
-            # Drop rows with invalid timestamps
-            df = df[df.index.notna()]
-            
-            # Select only OHLCV columns
-            df = df[['open', 'high', 'low', 'close', 'volume']].copy()
-            
-            # Ensure numeric types
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+            # Convert timestamp to datetime
+            timestamps = pd.to_datetime(df['open_time'], unit='ms', errors='coerce')
+            df = df[OHLCV_COLUMNS].set_index(pd.DatetimeIndex(timestamps, name='timestamp'))
             
             # Filter out invalid timestamps (corrupted data)
             # Valid range: 2000-01-01 to 2099-12-31
             valid_start = pd.Timestamp('2000-01-01')
             valid_end = pd.Timestamp('2099-12-31')
-            df = df[(df.index >= valid_start) & (df.index <= valid_end)]
+            if df.index.is_monotonic_increasing:
+                # Clean, sorted month: two binary searches, no mask
+                lo = df.index.searchsorted(valid_start, side='left')
+                hi = df.index.searchsorted(valid_end, side='right')
+                df = df.iloc[lo:hi]
+            else:
+                # NaT or out-of-order rows; NaT fails both comparisons
+                df = df[(df.index >= valid_start) & (df.index <= valid_end)]
             
             if df.empty:
                 logger.debug(f"No valid data after filtering for {symbol} {interval} {year}-{month_str}")
@@ -119,11 +286,20 @@ class BinanceDataDownloader:
             
             logger.info(f"✓ Downloaded {len(df)} candles for {symbol} {interval} {year}-{month_str} ({market_type})")
             
-            return df
+            # Write-then-rename so an interrupted run never leaves a truncated shard
+            shard.parent.mkdir(parents=True, exist_ok=True)
+            tmp_shard = shard.with_suffix('.tmp')
+            df.to_parquet(tmp_shard, compression='zstd')
+            tmp_shard.replace(shard)
             
+            return df
+        
         except requests.exceptions.RequestException as e:
             logger.debug(f"Error downloading {symbol} {interval} {year}-{month_str}: {e}")
             return None
+        except ValueError as e:
+            logger.warning(f"Could not parse {symbol} {interval} {year}-{month_str}: {e}")
+            return None
     
     def download_symbol_interval(
         self,
@@ -151,49 +327,58 @@ class BinanceDataDownloader:
         
         logger.info(f"Downloading {symbol} {interval} from {start_year} to {end_date.year}...")
         
-        all_data = []
+        # Symbols not listed on this market 404 for every month - find out with a few requests
+        if not self.probe(symbol, interval, start_year, end_date, market_type):
+            logger.info(f"{symbol} {interval} not available on {market_type} market")
+            return pd.DataFrame()
         
-        # Download year by year, month by month
+        # Enumerate every month in the range up front
+        months = []
         current_date = datetime(start_year, 1, 1)
         
         while current_date <= end_date:
-            df = self.download_monthly_klines(
-                symbol=symbol,
-                interval=interval,
-                year=current_date.year,
-                month=current_date.month,
-                market_type=market_type
-            )
-            
-            if df is not None and not df.empty:
-                all_data.append(df)
+            months.append((current_date.year, current_date.month))
             
             # Move to next month
             if current_date.month == 12:
                 current_date = datetime(current_date.year + 1, 1, 1)
             else:
                 current_date = datetime(current_date.year, current_date.month + 1, 1)
-            
-            # Rate limiting - be nice to Binance servers
-            time.sleep(0.2)
+        
+        # Download months concurrently (network bound); map() keeps chronological order
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            results = executor.map(
+                lambda ym: self.download_monthly_klines(
+                    symbol=symbol,
+                    interval=interval,
+                    year=ym[0],
+                    month=ym[1],
+                    market_type=market_type
+                ),
+                months
+            )
+            all_data = [df for df in results if df is not None and not df.empty]
         
         if not all_data:
             logger.warning(f"No data found for {symbol} {interval}")
             return pd.DataFrame()
         
-        # Combine all months
-        df_combined = pd.concat(all_data, axis=0)
-        df_combined = df_combined.sort_index()
+        # Combine all months - they arrive in chronological order, so the O(n)
+        # monotonic/unique checks normally let us skip the sort and dedupe
+        df_combined = pd.concat(all_data, axis=0) if len(all_data) > 1 else all_data[0]
+        if not df_combined.index.is_monotonic_increasing:
+            df_combined = df_combined.sort_index()
         
         # Remove duplicates (can happen at month boundaries)
-        df_combined = df_combined[~df_combined.index.duplicated(keep='first')]
+        if not df_combined.index.is_unique:
+            df_combined = df_combined[~df_combined.index.duplicated(keep='first')]
         
         logger.info(f"✓ Total: {len(df_combined)} candles from {df_combined.index.min()} to {df_combined.index.max()}")
         
         return df_combined
     
     def save_to_backtest_format(self, df: pd.DataFrame, symbol: str, interval: str):
-        """Save DataFrame in backtest-ready format"""
+        """Save DataFrame in backtest-ready format (Parquet)"""
         if df.empty:
             logger.warning(f"Skipping save - no data for {symbol} {interval}")
             return None
@@ -204,14 +389,70 @@ class BinanceDataDownloader:
         start_date = f"{start_ts.year:04d}{start_ts.month:02d}{start_ts.day:02d}"
         end_date = f"{end_ts.year:04d}{end_ts.month:02d}{end_ts.day:02d}"
         
-        filename = f"{symbol}_{interval}_{start_date}_{end_date}.csv"
+        filename = f"{symbol}_{interval}_{start_date}_{end_date}.parquet"
         filepath = self.output_dir / filename
         
-        df.to_csv(filepath)
+        # Compressed columnar storage; float64 as parsed, so prices match the source CSVs exactly
+        df.astype('float64').to_parquet(
+            filepath,
+            compression='zstd',
+            row_group_size=self.PARQUET_ROW_GROUP_SIZE
+        )
         logger.info(f"✓ Saved {len(df)} candles to {filepath.name}")
         
         return filepath
     
+    def build_timeframe_store(self, interval: str):
+        """
+        Combine every symbol's Parquet file for an interval into one Arrow IPC file
+        
+        Rows are grouped by symbol (time-sorted within each); the schema metadata maps
+        each symbol to its source file (name, mtime and size, so a rewritten file is
+        noticed) and row range so the loader can slice it zero-copy.
+        """
+        sources = {}
+        for filepath in sorted(self.output_dir.glob(f"*_{interval}_*.parquet")):
+            symbol = filepath.name.split('_', 1)[0]
+            sources.setdefault(symbol, filepath)  # earliest range first, like the loader
+        
+        if not sources:
+            return None
+        
+        tables = []
+        symbols_meta = {}
+        offset = 0
+        
+        for symbol, filepath in sources.items():
+            df = pd.read_parquet(filepath).reset_index()
+            df['symbol'] = symbol
+            tables.append(pa.Table.from_pandas(df, preserve_index=False))
+            stat = filepath.stat()
+            symbols_meta[symbol] = {
+                'file': filepath.name,
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'offset': offset,
+                'length': len(df)
+            }
+            offset += len(df)
+        
+        table = pa.concat_tables(tables)
+        table = table.set_column(
+            table.schema.get_field_index('symbol'), 'symbol',
+            table.column('symbol').dictionary_encode()
+        )
+        table = table.replace_schema_metadata({'symbols': json.dumps(symbols_meta)})
+        
+        # Uncompressed so the loader can memory-map it without decoding
+        filepath = self.output_dir / self.STORE_FILENAME.format(interval=interval)
+        with pa.OSFile(str(filepath), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        
+        logger.info(f"✓ Built {filepath.name} ({len(sources)} symbols, {offset} candles)")
+        
+        return filepath
+    
     def download_all_for_backtesting(
         self,
         symbols: List[str],
@@ -275,6 +516,9 @@ class BinanceDataDownloader:
                             'file': filepath.name
                         })
         
+        for interval in intervals:
+            self.build_timeframe_store(interval)
+        
         # Summary
         logger.info("\n" + "="*70)
         logger.info("DOWNLOAD SUMMARY")
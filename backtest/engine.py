@@ -17,6 +17,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from loguru import logger
 from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
 import json
 from pathlib import Path
 import sys
@@ -37,8 +38,18 @@ from src.strategy.signal_scorer import SignalScorer
 from src.strategy.stop_tp_calculator import StopTPCalculator
 from src.risk.position_sizer import PositionSizer
 from backtest.config import BacktestConfig
+from backtest.result_cache import ResultCache
+from backtest._kernels import (
+    LONG, SHORT, TP1_BIT, TP2_BIT, TP3_BIT, SL_NONE, SL_CONSERVATIVE,
+    check_tp_sl_many, scan_tp_sl, warm_up
+)
 
-@dataclass
+TP_BITS = {'tp1': TP1_BIT, 'tp2': TP2_BIT, 'tp3': TP3_BIT}
+
+# Trade fields results are grouped by (stored as category codes, see BacktestEngine._store_trade)
+TRADE_LABELS = ('regime', 'symbol', 'exit_reason')
+
+@dataclass(slots=True)
 class Position:
     """Active position in backtest"""
     symbol: str
@@ -55,9 +66,7 @@ class Position:
     entry_reason: str
     
     # Tracking
-    tp1_hit: bool = False
-    tp2_hit: bool = False
-    tp3_hit: bool = False
+    tp_flags: int = 0  # TP*_BIT mask of take profits hit
     remaining_percent: float = 100.0
     realized_pnl: float = 0.0
     
@@ -65,7 +74,15 @@ class Position:
     entry_atr: float = 0.0
     adaptive_stop_triggered: bool = False
     
-@dataclass
+    # Direction as a sign (LONG = +1, SHORT = -1), so price math needs no long/short branches:
+    # entry slippage is price * (1 + sign * s), exit slippage price * (1 - sign * s),
+    # and P&L is sign * (exit - entry) * contracts
+    sign: int = field(init=False, default=LONG)
+    
+    def __post_init__(self):
+        self.sign = LONG if self.direction == 'long' else SHORT
+
+@dataclass(slots=True)
 class Trade:
     """Completed trade record"""
     symbol: str
@@ -82,22 +99,151 @@ class Trade:
     duration_hours: float
     max_drawdown: float = 0.0
 
+def _indicator_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Indicator columns for one frame (pool task - returns only the new columns)"""
+    enriched = Indicators.add_all_indicators(df.copy(deep=False))
+    return enriched.drop(columns=df.columns)
+
+def _add_indicators(data: Dict[str, Dict[str, pd.DataFrame]]) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """
+    Shallow copies of all frames with indicator columns added
+    
+    Frames are independent, so with INDICATOR_WORKERS > 1 they are computed
+    across a process pool; only the indicator columns travel back.
+    """
+    frames = [(symbol, tf, df) for symbol, tfs in data.items() for tf, df in tfs.items()]
+    workers = min(BacktestConfig.INDICATOR_WORKERS, len(frames))
+    
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            columns = list(executor.map(_indicator_columns, [df for _, _, df in frames]))
+    else:
+        columns = [_indicator_columns(df) for _, _, df in frames]
+    
+    enriched = {symbol: {} for symbol in data}
+    for (symbol, tf, df), indicator_columns in zip(frames, columns):
+        df = df.copy(deep=False)
+        for name, values in indicator_columns.items():
+            df[name] = values
+        enriched[symbol][tf] = df
+    return enriched
+
+class PositionBook:
+    """
+    Hot fields of the active positions as parallel arrays (one slot per position)
+    
+    Position objects remain the full record; the book mirrors the fields the
+    per-candle TP/SL check reads so it can run over all open positions at once.
+    Call sync() after changing a position's stop or TP flags.
+    
+    next_time is the entry candle at which a position next needs checking:
+    the epoch (always due) until a forward scan sets it, NaT if nothing can hit.
+    """
+    
+    def __init__(self, capacity: int):
+        capacity = max(1, capacity)
+        self.direction = np.zeros(capacity, dtype=np.int8)
+        self.stop_loss = np.zeros(capacity, dtype=np.float64)
+        self.tp1 = np.zeros(capacity, dtype=np.float64)
+        self.tp2 = np.zeros(capacity, dtype=np.float64)
+        self.tp3 = np.zeros(capacity, dtype=np.float64)
+        self.tp_flags = np.zeros(capacity, dtype=np.uint8)
+        self.is_open = np.zeros(capacity, dtype=bool)
+        self.next_time = np.zeros(capacity, dtype='datetime64[ns]')
+        self.seq = np.zeros(capacity, dtype=np.int64)  # Opening order (= active_positions order)
+        self.symbols: List[Optional[str]] = [None] * capacity
+        self.slots: Dict[str, int] = {}
+        self._opened = 0
+    
+    def _grow(self):
+        """Double capacity (only if more positions open than configured)"""
+        for name in ('direction', 'stop_loss', 'tp1', 'tp2', 'tp3', 'tp_flags', 'is_open', 'next_time', 'seq'):
+            arr = getattr(self, name)
+            setattr(self, name, np.concatenate([arr, np.zeros_like(arr)]))
+        self.symbols.extend([None] * len(self.symbols))
+    
+    def add(self, position: 'Position') -> int:
+        """Store position in a free slot"""
+        free = np.flatnonzero(~self.is_open)
+        if not len(free):
+            self._grow()
+            free = np.flatnonzero(~self.is_open)
+        
+        slot = int(free[0])
+        self.slots[position.symbol] = slot
+        self.symbols[slot] = position.symbol
+        self.is_open[slot] = True
+        self.seq[slot] = self._opened
+        self._opened += 1
+        self.direction[slot] = position.sign
+        self.tp1[slot] = position.take_profits['tp1']['price']
+        self.tp2[slot] = position.take_profits['tp2']['price']
+        self.tp3[slot] = position.take_profits['tp3']['price']
+        self.next_time[slot] = np.datetime64(0, 'ns')
+        self.sync(position)
+        return slot
+    
+    def sync(self, position: 'Position'):
+        """Copy position's mutable fields (stop, TP flags) into its slot"""
+        slot = self.slots[position.symbol]
+        self.stop_loss[slot] = position.stop_loss
+        self.tp_flags[slot] = position.tp_flags
+    
+    def remove(self, symbol: str):
+        """Free the symbol's slot"""
+        slot = self.slots.pop(symbol, None)
+        if slot is not None:
+            self.is_open[slot] = False
+            self.symbols[slot] = None
+    
+    def due(self, time: np.datetime64) -> np.ndarray:
+        """Slots of open positions to check at time, in opening order"""
+        slots = np.flatnonzero(self.is_open & (self.next_time <= time))
+        return slots[np.argsort(self.seq[slots], kind='stable')]
+
 class BacktestEngine:
     """Core backtesting engine - candle-by-candle replay"""
     
-    def __init__(self, data: Dict[str, Dict[str, pd.DataFrame]]):
+    def __init__(self, data: Dict[str, Dict[str, pd.DataFrame]], trade_symbols: Optional[List[str]] = None):
         """
         Args:
             data: Dict[symbol][timeframe] = DataFrame
+            trade_symbols: Symbols to scan for entries (default: all in data).
+                Other symbols only serve as reference data, e.g. BTCUSDT for the regime check.
         """
-        self.data = data
+        # Indicators are computed once over each full history (they only look back,
+        # so row t never sees future candles); per-bar slices just read them.
+        # Shallow copies keep the caller's frames free of the indicator columns.
+        self.data = _add_indicators(data)
+        self.trade_symbols = list(data) if trade_symbols is None else [s for s in trade_symbols if s in data]
         self.equity = BacktestConfig.INITIAL_CAPITAL
         self.initial_equity = BacktestConfig.INITIAL_CAPITAL
         
         # Positions and tracking
         self.active_positions: Dict[str, Position] = {}
+        self._book = PositionBook(BacktestConfig.MAX_TOTAL_ACTIVE_SIGNALS)
         self.closed_trades: List[Trade] = []
-        self.equity_curve: List[Tuple[datetime, float]] = []
+        
+        # Open position flag per symbol (index from _sym_idx) for the per-candle scan
+        self._sym_idx: Dict[str, int] = {symbol: k for k, symbol in enumerate(data)}
+        self._trade_idx = np.array([self._sym_idx[s] for s in self.trade_symbols], dtype=np.intp)
+        self._open_mask = np.zeros(len(data), dtype=bool)
+        self._total_margin_used = 0.0  # Sum of margin_used over active_positions
+        
+        # Columnar trade metrics, filled as trades close (capacity doubles when full)
+        self._pnl_arr = np.empty(1024)
+        self._duration_arr = np.empty(1024)
+        self._n_trades = 0
+        
+        # Grouping labels as category codes: row k of _label_codes holds codes for
+        # TRADE_LABELS[k], indexing into that label's _categories (value -> code)
+        self._categories: Dict[str, Dict[str, int]] = {name: {} for name in TRADE_LABELS}
+        self._label_codes = np.empty((len(TRADE_LABELS), 1024), dtype=np.int32)
+        
+        # Equity curve as parallel time/value arrays (see equity_curve for the list view)
+        self._eq_times = np.empty(1024, dtype='datetime64[ns]')
+        self._eq_vals = np.empty(1024)
+        self._n_equity = 0
         
         # Risk management state
         self.daily_pnl = 0.0
@@ -110,12 +256,71 @@ class BacktestEngine:
         self.total_fees_paid = 0.0
         self.total_slippage_cost = 0.0
         
+        # Config values read on every candle, bound once per engine (percents as fractions)
+        self._logging = BacktestConfig.ENABLE_LOGGING
+        self._debug = self._logging and BacktestConfig.LOG_LEVEL == 'DEBUG'
+        self._htf = BacktestConfig.HTF_TIMEFRAME
+        self._primary_tf = BacktestConfig.PRIMARY_TIMEFRAME
+        self._entry_tf = BacktestConfig.ENTRY_TIMEFRAME
+        self._market_orders = BacktestConfig.USE_MARKET_ORDERS
+        self._slippage = BacktestConfig.SLIPPAGE_PERCENT / 100
+        self._stop_slippage = BacktestConfig.STOP_LOSS_SLIPPAGE / 100
+        self._taker_fee = BacktestConfig.TAKER_FEE / 100
+        self._conservative = BacktestConfig.CONSERVATIVE_MODE
+        self._adaptive_stops = BacktestConfig.ADAPTIVE_STOP_ENABLED
+        self._max_signals = BacktestConfig.MAX_TOTAL_ACTIVE_SIGNALS
+        self._max_consecutive_losses = BacktestConfig.MAX_CONSECUTIVE_LOSSES
+        self._max_weekly_loss = BacktestConfig.MAX_WEEKLY_LOSS
+        
+        # Raw candle arrays (keeps .loc out of the bar loop). These are views of the
+        # frames' float64 columns, not copies; candles are located by binary search
+        # on the datetime64 index values instead of a per-candle Timestamp dict.
+        self._arr: Dict[str, Dict[str, Dict]] = {}
+        for symbol, frames in self.data.items():
+            self._arr[symbol] = {}
+            for tf, df in frames.items():
+                self._arr[symbol][tf] = {
+                    'high': df['high'].to_numpy(dtype=np.float64, copy=False),
+                    'low': df['low'].to_numpy(dtype=np.float64, copy=False),
+                    'close': df['close'].to_numpy(dtype=np.float64, copy=False),
+                    'atr': df['atr'].to_numpy(dtype=np.float64, copy=False),
+                    'ts': df.index.values
+                }
+        
+        # Earliest time each tradable symbol has the 200 candles on every timeframe that
+        # the signal scan needs for EMA200 (NaT = never), instead of per-candle length checks
+        ready_at = []
+        for symbol in self.trade_symbols:
+            frames = self._arr[symbol]
+            ready_at.append(np.max([
+                frames[tf]['ts'][199] if tf in frames and len(frames[tf]['ts']) >= 200 else np.datetime64('NaT')
+                for tf in (self._htf, self._primary_tf, self._entry_tf)
+            ]))
+        self._scan_ready_at = np.array(ready_at, dtype='datetime64[ns]')
+        
+        # Replay time and its datetime64 form (see _datetime64)
+        self._clock = (None, None)
+        
+        # Last regime per symbol as (primary candle count, regime) - see _primary_regime
+        self._regimes: Dict[str, tuple] = {}
+        
+        # Last BTC regime adjustments as (HTF candle count, adjustments) - see _scan_for_signals
+        self._btc_regime: Optional[tuple] = None
+        
+        # JIT-compile the kernels before the replay (keeps the progress bar ETA honest)
+        warm_up()
+        
         if BacktestConfig.ENABLE_LOGGING:
             logger.info(f"Backtest initialized with ${self.equity:.2f}")
     
     def _log(self, level: str, message: str):
-        """Conditional logging based on config"""
-        if not BacktestConfig.ENABLE_LOGGING:
+        """
+        Conditional logging based on config
+        
+        Callers guard debug messages with `if self._debug:` (LOG_LEVEL = 'DEBUG'),
+        so per-candle f-strings aren't built when they would be dropped anyway.
+        """
+        if not self._logging:
             return
         
         if level == 'info':
@@ -140,16 +345,28 @@ class BacktestEngine:
         self._log('info', "STARTING BACKTEST")
         self._log('info', "="*70)
         
-        # Get date range from data
-        all_dates = set()
-        for symbol in self.data:
-            if BacktestConfig.ENTRY_TIMEFRAME in self.data[symbol]:
-                all_dates.update(self.data[symbol][BacktestConfig.ENTRY_TIMEFRAME].index)
-        
-        if not all_dates:
+        # Reuse the results of an identical earlier run (same data, config and code)
+        cache = ResultCache() if BacktestConfig.CACHE_RESULTS else None
+        if cache is not None:
+            cache_key = cache.key(self.data, self.trade_symbols)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                self._restore_run(cached)
+                self._log('info', f"Loaded cached backtest results ({cache.stats()})")
+                return cached['results']
+        
+        # Get date range from data (sorted union of the entry timeframe indexes)
+        indexes = [
+            self.data[symbol][self._entry_tf].index.values
+            for symbol in self.data
+            if self._entry_tf in self.data[symbol]
+        ]
+        
+        if not any(len(index) for index in indexes):
             raise ValueError("No data available for backtesting")
         
-        sorted_dates = sorted(all_dates)
+        times = np.unique(np.concatenate(indexes))
+        sorted_dates = pd.DatetimeIndex(times)
         start_date = sorted_dates[0]
         end_date = sorted_dates[-1]
         
@@ -164,12 +381,21 @@ class BacktestEngine:
         else:
             warmup_date = start_date
         
-        # Process each candle with progress bar
+        self._reserve_equity(self._n_equity + len(sorted_dates))
+        
+        # Process each candle with progress bar (refreshed every 1000 candles at most,
+        # so the bar's bookkeeping stays out of the per-candle cost)
         iterator = enumerate(sorted_dates)
         if BacktestConfig.SHOW_PROGRESS_BAR and TQDM_AVAILABLE:
-            iterator = tqdm(iterator, total=len(sorted_dates), desc="Running backtest", unit="candles", leave=True, ncols=100)
+            iterator = tqdm(
+                iterator, total=len(sorted_dates), desc="Running backtest", unit="candles", leave=True, ncols=100,
+                miniters=1000, mininterval=0.5
+            )
         
         for i, current_time in iterator:
+            # The candle's datetime64 is already at hand - seed the lookup clock with it
+            self._clock = (current_time, times[i])
+            
             # Daily reset
             self._check_daily_reset(current_time)
             
@@ -178,21 +404,22 @@ class BacktestEngine:
             
             # Skip signal scanning during warmup period
             if current_time < warmup_date:
-                self.equity_curve.append((current_time, self.equity))
+                self._record_equity(times[i], self.equity)
                 continue
             
             # Check if trading allowed
             can_trade, reason = self._can_trade(current_time)
             
             if not can_trade:
-                self._log('debug', f"{current_time}: Trading disabled - {reason}")
+                if self._debug:
+                    self._log('debug', f"{current_time}: Trading disabled - {reason}")
                 continue
             
             # Scan for new signals
             self._scan_for_signals(current_time)
             
             # Record equity
-            self.equity_curve.append((current_time, self.equity))
+            self._record_equity(times[i], self.equity)
         
         # Close any remaining positions at end
         self._close_all_positions(end_date, "backtest_end")
@@ -200,44 +427,117 @@ class BacktestEngine:
         # Calculate results
         results = self._calculate_results()
         
+        if cache is not None:
+            n = self._n_equity
+            cache.put(cache_key, {
+                'results': results,
+                'closed_trades': self.closed_trades,
+                'equity_times': self._eq_times[:n].copy(),
+                'equity_values': self._eq_vals[:n].copy(),
+                'equity': self.equity,
+                'total_fees_paid': self.total_fees_paid
+            })
+            self._log('info', f"Saved backtest results to cache ({cache.stats()})")
+        
         self._log('info', "="*70)
         self._log('info', "BACKTEST COMPLETE")
         self._log('info', "="*70)
         
         return results
     
+    def _restore_run(self, cached: Dict):
+        """Load trades, equity curve and totals of a cached run"""
+        for trade in cached['closed_trades']:
+            self._store_trade(trade)
+        
+        self._reserve_equity(len(cached['equity_values']))
+        for time, equity in zip(cached['equity_times'], cached['equity_values']):
+            self._record_equity(time, equity)
+        
+        self.equity = cached['equity']
+        self.total_fees_paid = cached['total_fees_paid']
+    
+    @property
+    def equity_curve(self) -> List[Tuple[datetime, float]]:
+        """Recorded (time, equity) points"""
+        n = self._n_equity
+        return list(zip(pd.DatetimeIndex(self._eq_times[:n]), self._eq_vals[:n].tolist()))
+    
+    def _reserve_equity(self, capacity: int):
+        """Make room for at least capacity equity points"""
+        if capacity > len(self._eq_vals):
+            n = self._n_equity
+            times = np.empty(capacity, dtype='datetime64[ns]')
+            vals = np.empty(capacity)
+            times[:n] = self._eq_times[:n]
+            vals[:n] = self._eq_vals[:n]
+            self._eq_times, self._eq_vals = times, vals
+    
+    def _record_equity(self, time: datetime, equity: float):
+        """Append a point to the equity curve"""
+        n = self._n_equity
+        if n == len(self._eq_vals):
+            self._reserve_equity(2 * n)
+        
+        self._eq_times[n] = time
+        self._eq_vals[n] = equity
+        self._n_equity = n + 1
+    
+    def _datetime64(self, time: datetime) -> np.datetime64:
+        """time as datetime64 for searching the candle arrays (converted once per candle)"""
+        if time is not self._clock[0]:
+            self._clock = (time, np.datetime64(time))
+        return self._clock[1]
+    
+    def _bar_index(self, arr: Dict, time: datetime) -> Optional[int]:
+        """Index of the candle at exactly `time` in a self._arr entry, or None"""
+        ts = arr['ts']
+        t = self._datetime64(time)
+        i = int(ts.searchsorted(t))
+        return i if i < len(ts) and ts[i] == t else None
+    
     def _update_positions(self, current_time: datetime):
         """Update all active positions - check for TP/SL hits and adaptive stops"""
         symbols_to_close = []
+        book = self._book
+        
+        # Positions to check at current_time (with the candle index), and that candle's high/low
+        live = []
+        highs = []
+        lows = []
         
-        for symbol, position in self.active_positions.items():
+        # Only positions whose levels can be hit now (positions still watching for an
+        # adaptive stop are never scanned ahead, so they are due every candle)
+        for slot in book.due(self._datetime64(current_time)).tolist():
+            symbol = book.symbols[slot]
+            position = self.active_positions[symbol]
+            
             # Get current candle
-            if symbol not in self.data:
+            if symbol not in self._arr:
                 continue
             
-            df = self.data[symbol][BacktestConfig.ENTRY_TIMEFRAME]
+            arr = self._arr[symbol][self._entry_tf]
+            i = self._bar_index(arr, current_time)
             
-            if current_time not in df.index:
+            if i is None:
                 continue
             
-            candle = df.loc[current_time]
-            high = candle['high']
-            low = candle['low']
-            close = candle['close']
+            adaptive_pending = self._adaptive_stops and not position.adaptive_stop_triggered
+            
+            high = arr['high'][i]
+            low = arr['low'][i]
+            close = arr['close'][i]
             
             # === ADAPTIVE STOP CHECK (before checking TP/SL hits) ===
             # Only check if enabled and position hasn't triggered adaptive stop yet
-            if BacktestConfig.ADAPTIVE_STOP_ENABLED and not getattr(position, 'adaptive_stop_triggered', False):
-                # Get current market data
-                data = self._get_mtf_data(symbol, current_time)
-                if data:
-                    # Add indicators
-                    for tf in data:
-                        data[tf] = Indicators.add_all_indicators(data[tf])
-                    
-                    current_atr = data['primary']['atr'].iloc[-1]
-                    current_regime = RegimeDetector.detect_regime(data['primary'])
-                    entry_atr = getattr(position, 'entry_atr', 0.0)
+            if adaptive_pending:
+                # Current primary candle's ATR and regime, from the precomputed columns and
+                # the per-candle regime memo (needs data on all timeframes, like _get_mtf_data)
+                i_primary = self._candle_count(symbol, self._primary_tf, current_time)
+                if i_primary and self._candle_count(symbol, self._htf, current_time):
+                    current_atr = self._arr[symbol][self._primary_tf]['atr'][i_primary - 1]
+                    current_regime = self._primary_regime(symbol, i_primary)
+                    entry_atr = position.entry_atr
                     
                     # Check if adaptive stop should trigger
                     should_trigger, new_stop, reason = self._check_adaptive_stop_trigger(
@@ -258,53 +558,88 @@ class BacktestEngine:
                             # Full protection: move stop to breakeven
                             position.stop_loss = new_stop
                             position.adaptive_stop_triggered = True
+                        
+                        book.sync(position)
             
-            # Check for hits (CONSERVATIVE MODE)
-            if position.direction == 'long':
-                sl_hit = low <= position.stop_loss
-                tp1_hit = not position.tp1_hit and high >= position.take_profits['tp1']['price']
-                tp2_hit = not position.tp2_hit and position.tp1_hit and high >= position.take_profits['tp2']['price']
-                tp3_hit = not position.tp3_hit and position.tp2_hit and high >= position.take_profits['tp3']['price']
-            else:  # short
-                sl_hit = high >= position.stop_loss
-                tp1_hit = not position.tp1_hit and low <= position.take_profits['tp1']['price']
-                tp2_hit = not position.tp2_hit and position.tp1_hit and low <= position.take_profits['tp2']['price']
-                tp3_hit = not position.tp3_hit and position.tp2_hit and low <= position.take_profits['tp3']['price']
+            live.append((symbol, position, i))
+            highs.append(high)
+            lows.append(low)
+        
+        if not live:
+            return
+        
+        # Check for hits across all live positions at once (CONSERVATIVE MODE)
+        slots = np.array([book.slots[symbol] for symbol, _, _ in live], dtype=np.intp)
+        tp_levels, sl_outcomes = check_tp_sl_many(
+            book.direction[slots],
+            book.stop_loss[slots],
+            book.tp1[slots], book.tp2[slots], book.tp3[slots],
+            book.tp_flags[slots],
+            np.array(highs, dtype=np.float64),
+            np.array(lows, dtype=np.float64),
+            self._conservative
+        )
+        
+        # Only positions with an event need handling (most due positions are adaptive-stop checks)
+        for k in np.flatnonzero(tp_levels | sl_outcomes).tolist():
+            symbol, position, _ = live[k]
+            tp_level = int(tp_levels[k])
+            sl_outcome = int(sl_outcomes[k])
+            tps = position.take_profits
             
             # Conservative mode: if both SL and TP hit in same candle, assume SL hit first
-            if BacktestConfig.CONSERVATIVE_MODE and sl_hit and (tp1_hit or tp2_hit or tp3_hit):
-                self._log('debug', f"{current_time} {symbol}: Both TP and SL hit - assuming SL (conservative)")
+            if sl_outcome == SL_CONSERVATIVE:
+                if self._debug:
+                    self._log('debug', f"{current_time} {symbol}: Both TP and SL hit - assuming SL (conservative)")
                 self._close_position(position, current_time, position.stop_loss, "stopped", sl_hit=True)
                 symbols_to_close.append(symbol)
                 continue
             
             # Check TP hits
-            if tp3_hit:
-                self._handle_tp_hit(position, current_time, 'tp3', position.take_profits['tp3']['price'])
+            if tp_level == 3:
+                self._handle_tp_hit(position, current_time, 'tp3', tps['tp3']['price'])
                 symbols_to_close.append(symbol)
-            elif tp2_hit:
-                self._handle_tp_hit(position, current_time, 'tp2', position.take_profits['tp2']['price'])
-            elif tp1_hit:
-                self._handle_tp_hit(position, current_time, 'tp1', position.take_profits['tp1']['price'])
+            elif tp_level == 2:
+                self._handle_tp_hit(position, current_time, 'tp2', tps['tp2']['price'])
+            elif tp_level == 1:
+                self._handle_tp_hit(position, current_time, 'tp1', tps['tp1']['price'])
+            
+            if tp_level:
+                book.sync(position)
             
             # Check SL hit
-            if sl_hit and symbol not in symbols_to_close:
+            if sl_outcome != SL_NONE and symbol not in symbols_to_close:
                 self._close_position(position, current_time, position.stop_loss, "stopped", sl_hit=True)
                 symbols_to_close.append(symbol)
         
         # Remove closed positions
         for symbol in symbols_to_close:
             if symbol in self.active_positions:
-                del self.active_positions[symbol]
+                self._release(self.active_positions.pop(symbol))
+        
+        # Scan the rest forward to their next possible hit with the (possibly trailed) levels
+        for symbol, position, i in live:
+            if symbol not in book.slots or (self._adaptive_stops and not position.adaptive_stop_triggered):
+                continue
+            
+            slot = book.slots[symbol]
+            arr = self._arr[symbol][self._entry_tf]
+            k = scan_tp_sl(
+                int(book.direction[slot]),
+                book.stop_loss[slot],
+                book.tp1[slot], book.tp2[slot], book.tp3[slot],
+                int(book.tp_flags[slot]),
+                arr['high'], arr['low'],
+                i + 1,
+                self._conservative
+            )
+            book.next_time[slot] = arr['ts'][k] if k < len(arr['ts']) else np.datetime64('NaT')
     
     def _handle_tp_hit(self, position: Position, current_time: datetime, tp_level: str, tp_price: float):
         """Handle take profit hit"""
         # Apply slippage
-        if BacktestConfig.USE_MARKET_ORDERS:
-            if position.direction == 'long':
-                exit_price = tp_price * (1 - BacktestConfig.SLIPPAGE_PERCENT / 100)
-            else:
-                exit_price = tp_price * (1 + BacktestConfig.SLIPPAGE_PERCENT / 100)
+        if self._market_orders:
+            exit_price = tp_price * (1 - position.sign * self._slippage)
         else:
             exit_price = tp_price
         
@@ -312,34 +647,29 @@ class BacktestEngine:
         close_percent = position.take_profits[tp_level]['close_percent']
         portion_contracts = position.contracts * (close_percent / 100)
         
-        if position.direction == 'long':
-            pnl = (exit_price - position.entry_price) * portion_contracts
-        else:
-            pnl = (position.entry_price - exit_price) * portion_contracts
+        pnl = position.sign * (exit_price - position.entry_price) * portion_contracts
         
         # Subtract fees
         exit_value = exit_price * portion_contracts
-        fee = exit_value * (BacktestConfig.TAKER_FEE / 100)
+        fee = exit_value * self._taker_fee
         pnl -= fee
         self.total_fees_paid += fee
         
         # Update position
         position.realized_pnl += pnl
         position.remaining_percent -= close_percent
-        setattr(position, f'{tp_level}_hit', True)
+        position.tp_flags |= TP_BITS[tp_level]
         
         # Trail stop
         if tp_level == 'tp1':
-            # Move to 50% risk
-            if position.direction == 'long':
-                position.stop_loss = position.stop_loss + (position.entry_price - position.stop_loss) * 0.5
-            else:
-                position.stop_loss = position.stop_loss - (position.stop_loss - position.entry_price) * 0.5
+            # Move to 50% risk (same formula for both directions)
+            position.stop_loss = position.stop_loss + (position.entry_price - position.stop_loss) * 0.5
         elif tp_level == 'tp2':
             # Move to breakeven
             position.stop_loss = position.entry_price
         
-        self._log('debug', f"{current_time} {position.symbol}: {tp_level.upper()} hit | P&L: ${pnl:.2f}")
+        if self._debug:
+            self._log('debug', f"{current_time} {position.symbol}: {tp_level.upper()} hit | P&L: ${pnl:.2f}")
         
         # If fully closed
         if position.remaining_percent <= 0:
@@ -349,27 +679,18 @@ class BacktestEngine:
         """Close position and record trade"""
         # Apply extra slippage on stop losses
         if sl_hit:
-            if position.direction == 'long':
-                exit_price = exit_price * (1 - BacktestConfig.STOP_LOSS_SLIPPAGE / 100)
-            else:
-                exit_price = exit_price * (1 + BacktestConfig.STOP_LOSS_SLIPPAGE / 100)
-        elif BacktestConfig.USE_MARKET_ORDERS:
-            if position.direction == 'long':
-                exit_price = exit_price * (1 - BacktestConfig.SLIPPAGE_PERCENT / 100)
-            else:
-                exit_price = exit_price * (1 + BacktestConfig.SLIPPAGE_PERCENT / 100)
+            exit_price = exit_price * (1 - position.sign * self._stop_slippage)
+        elif self._market_orders:
+            exit_price = exit_price * (1 - position.sign * self._slippage)
         
         # Calculate PnL for remaining position
         remaining_contracts = position.contracts * (position.remaining_percent / 100)
         
-        if position.direction == 'long':
-            pnl = (exit_price - position.entry_price) * remaining_contracts
-        else:
-            pnl = (position.entry_price - exit_price) * remaining_contracts
+        pnl = position.sign * (exit_price - position.entry_price) * remaining_contracts
         
         # Subtract fees
         exit_value = exit_price * remaining_contracts
-        fee = exit_value * (BacktestConfig.TAKER_FEE / 100)
+        fee = exit_value * self._taker_fee
         pnl -= fee
         self.total_fees_paid += fee
         
@@ -399,7 +720,7 @@ class BacktestEngine:
             duration_hours=duration
         )
         
-        self.closed_trades.append(trade)
+        self._store_trade(trade)
         
         # Update equity
         self.equity += position.realized_pnl
@@ -409,7 +730,7 @@ class BacktestEngine:
         # Track consecutive losses
         if position.realized_pnl < 0:
             self.consecutive_losses += 1
-            if self.consecutive_losses >= BacktestConfig.MAX_CONSECUTIVE_LOSSES:
+            if self.consecutive_losses >= self._max_consecutive_losses:
                 self.cooldown_until = exit_time + timedelta(hours=BacktestConfig.COOLDOWN_HOURS)
                 self._log('info', f"{exit_time}: Cooldown activated until {self.cooldown_until}")
         else:
@@ -417,6 +738,22 @@ class BacktestEngine:
         
         self._log('info', f"{exit_time} {position.symbol}: Trade closed | {reason} | P&L: ${position.realized_pnl:+.2f} | Equity: ${self.equity:.2f}")
     
+    def _store_trade(self, trade: Trade):
+        """Append trade to closed_trades and the columnar metric arrays"""
+        n = self._n_trades
+        if n == len(self._pnl_arr):
+            self._pnl_arr = np.concatenate([self._pnl_arr, np.empty(n)])
+            self._duration_arr = np.concatenate([self._duration_arr, np.empty(n)])
+            self._label_codes = np.concatenate([self._label_codes, np.empty_like(self._label_codes)], axis=1)
+        
+        self._pnl_arr[n] = trade.pnl
+        self._duration_arr[n] = trade.duration_hours
+        for k, name in enumerate(TRADE_LABELS):
+            codes = self._categories[name]
+            self._label_codes[k, n] = codes.setdefault(getattr(trade, name), len(codes))
+        self._n_trades = n + 1
+        self.closed_trades.append(trade)
+    
     def _scan_for_signals(self, current_time: datetime):
         """Scan for new trading signals (uses EXACT live bot logic)"""
         # === PHASE 1: BTC REGIME CHECK (Market-wide filter) ===
@@ -426,73 +763,71 @@ class BacktestEngine:
         btc_max_signals_adj = 0
         
         if 'BTCUSDT' in self.data:
-            try:
-                btc_data = self._get_mtf_data('BTCUSDT', current_time)
-                if btc_data:
-                    # Validate BTC data has enough candles for indicators
-                    if len(btc_data['htf']) < 200:
-                        self._log('debug', f"{current_time}: Insufficient BTC data for regime check ({len(btc_data['htf'])} candles)")
-                        btc_threshold_adj = 5  # Conservative default
-                        btc_position_mult = 0.9
-                        btc_max_signals_adj = 0
-                    else:
-                        btc_data['htf'] = Indicators.add_all_indicators(btc_data['htf'])
-                        btc_regime_info = RegimeDetector.check_btc_regime(btc_data['htf'])
-                        
-                        # Apply BTC regime adjustments
-                        btc_threshold_adj = btc_regime_info['score_threshold_adj']
-                        btc_position_mult = btc_regime_info['position_size_mult']
-                        btc_max_signals_adj = btc_regime_info['max_signals_adj']
+            # The check only reads BTC's HTF candles, so its result holds until the next one closes
+            i_htf = self._candle_count('BTCUSDT', self._htf, current_time)
+            if self._btc_regime is not None and self._btc_regime[0] == i_htf:
+                btc_threshold_adj, btc_position_mult, btc_max_signals_adj = self._btc_regime[1]
+            else:
+                try:
+                    btc_data = self._get_mtf_data('BTCUSDT', current_time)
+                    if btc_data:
+                        # Validate BTC data has enough candles for indicators
+                        if len(btc_data['htf']) < 200:
+                            if self._debug:
+                                self._log('debug', f"{current_time}: Insufficient BTC data for regime check ({len(btc_data['htf'])} candles)")
+                            btc_threshold_adj = 5  # Conservative default
+                            btc_position_mult = 0.9
+                            btc_max_signals_adj = 0
+                        else:
+                            btc_regime_info = RegimeDetector.check_btc_regime(btc_data['htf'])
+                            
+                            # Apply BTC regime adjustments
+                            btc_threshold_adj = btc_regime_info['score_threshold_adj']
+                            btc_position_mult = btc_regime_info['position_size_mult']
+                            btc_max_signals_adj = btc_regime_info['max_signals_adj']
+                            
+                            if self._debug:
+                                self._log('debug', f"{current_time}: BTC Regime {btc_regime_info['regime']} - Threshold adj: +{btc_threshold_adj}, Position mult: {btc_position_mult:.2f}")
                         
-                        self._log('debug', f"{current_time}: BTC Regime {btc_regime_info['regime']} - Threshold adj: +{btc_threshold_adj}, Position mult: {btc_position_mult:.2f}")
-            except Exception as e:
-                self._log('warning', f"BTC regime check failed: {e}, proceeding with defaults")
-                btc_threshold_adj = 5
-                btc_position_mult = 0.9
-                btc_max_signals_adj = 0
+                        self._btc_regime = (i_htf, (btc_threshold_adj, btc_position_mult, btc_max_signals_adj))
+                except Exception as e:
+                    self._log('warning', f"BTC regime check failed: {e}, proceeding with defaults")
+                    btc_threshold_adj = 5
+                    btc_position_mult = 0.9
+                    btc_max_signals_adj = 0
         
         # Check adjusted max signals limit
         current_signals = len(self.active_positions)
-        adjusted_max_signals = max(1, BacktestConfig.MAX_TOTAL_ACTIVE_SIGNALS + btc_max_signals_adj)
+        adjusted_max_signals = max(1, self._max_signals + btc_max_signals_adj)
         
         if current_signals >= adjusted_max_signals:
-            self._log('debug', f"{current_time}: Max signals reached ({current_signals}/{adjusted_max_signals}) due to BTC regime")
+            if self._debug:
+                self._log('debug', f"{current_time}: Max signals reached ({current_signals}/{adjusted_max_signals}) due to BTC regime")
             return
         
         # === PHASE 2: SCAN INDIVIDUAL SYMBOLS ===
-        # Scan all symbols in the loaded data
-        for symbol in self.data.keys():
-            # Skip if position already exists
-            if symbol in self.active_positions:
-                continue
+        # Scan the tradable symbols with enough history and no open position (one mask
+        # for all; a symbol opened during this scan isn't visited again anyway)
+        scannable = ~self._open_mask[self._trade_idx] & (self._scan_ready_at <= self._datetime64(current_time))
+        for k in np.flatnonzero(scannable).tolist():
+            symbol = self.trade_symbols[k]
             
             # Check position limits
             if len(self.active_positions) >= adjusted_max_signals:
                 continue
             
             try:
-                # Get multi-timeframe data UP TO current_time (no future data!)
-                data = self._get_mtf_data(symbol, current_time)
+                # Check individual symbol regime first - the cheapest filter, and it
+                # rejects most candles before the other timeframes are touched
+                regime = self._primary_regime(symbol, self._candle_count(symbol, self._primary_tf, current_time))
                 
-                if not data:
-                    continue
-                
-                # Validate sufficient data for indicators (need at least 200 candles for EMA200)
-                min_candles_needed = 200
-                if (len(data['htf']) < min_candles_needed or 
-                    len(data['primary']) < min_candles_needed or 
-                    len(data['entry']) < min_candles_needed):
-                    self._log('debug', f"{current_time} {symbol}: Insufficient data (HTF: {len(data['htf'])}, Primary: {len(data['primary'])}, Entry: {len(data['entry'])})")
+                if not RegimeDetector.should_trade_regime(regime):
                     continue
                 
-                # Add indicators
-                for tf in data:
-                    data[tf] = Indicators.add_all_indicators(data[tf])
-                
-                # Check individual symbol regime
-                regime = RegimeDetector.detect_regime(data['primary'])
+                # Get multi-timeframe data UP TO current_time (no future data!)
+                data = self._get_mtf_data(symbol, current_time)
                 
-                if not RegimeDetector.should_trade_regime(regime):
+                if not data:
                     continue
                 
                 # Get base score threshold based on equity state
@@ -502,25 +837,29 @@ class BacktestEngine:
                 # Apply BTC regime adjustment to threshold
                 threshold = base_threshold + btc_threshold_adj
                 
-                # Check long entry
-                long_check = EntryLogic.check_long_entry(data)
-                score, breakdown = SignalScorer.calculate_score_with_breakdown(data, 'long', symbol)
+                # Score both sides in one pass (they share the indicator reads)
+                long_score, short_score, _ = SignalScorer.calculate_both_scores(data, symbol)
                 
-                # Allow signal if entry requirements met OR score >= 85 (exceptional score override)
-                if (long_check['valid'] or score >= 85) and score >= threshold:
-                    reason = long_check['reason'] if long_check['valid'] else f"High score override (85+): {long_check['reason']}"
-                    self._create_position(symbol, 'long', data, current_time, reason, score, regime, btc_position_mult)
-                    continue
+                # Check long entry - a side under the threshold can't signal whatever
+                # its entry check says, so the check is skipped
+                if long_score >= threshold:
+                    long_check = EntryLogic.check_long_entry(data)
+                    
+                    # Allow signal if entry requirements met OR score >= 85 (exceptional score override)
+                    if long_check['valid'] or long_score >= 85:
+                        reason = long_check['reason'] if long_check['valid'] else f"High score override (85+): {long_check['reason']}"
+                        self._create_position(symbol, 'long', data, current_time, reason, long_score, regime, btc_position_mult)
+                        continue
                 
                 # Check short entry
-                short_check = EntryLogic.check_short_entry(data)
-                score, breakdown = SignalScorer.calculate_score_with_breakdown(data, 'short', symbol)
-                
-                # Allow signal if entry requirements met OR score >= 85 (exceptional score override)
-                if (short_check['valid'] or score >= 85) and score >= threshold:
-                    reason = short_check['reason'] if short_check['valid'] else f"High score override (85+): {short_check['reason']}"
-                    self._create_position(symbol, 'short', data, current_time, reason, score, regime, btc_position_mult)
-                
+                if short_score >= threshold:
+                    short_check = EntryLogic.check_short_entry(data)
+                    
+                    # Allow signal if entry requirements met OR score >= 85 (exceptional score override)
+                    if short_check['valid'] or short_score >= 85:
+                        reason = short_check['reason'] if short_check['valid'] else f"High score override (85+): {short_check['reason']}"
+                        self._create_position(symbol, 'short', data, current_time, reason, short_score, regime, btc_position_mult)
+            
             except Exception as e:
                 self._log('error', f"Error scanning {symbol} at {current_time}: {e}")
     
@@ -529,11 +868,9 @@ class BacktestEngine:
         entry_price = data['entry']['close'].iloc[-1]
         
         # Apply entry slippage
-        if BacktestConfig.USE_MARKET_ORDERS:
-            if direction == 'long':
-                entry_price = entry_price * (1 + BacktestConfig.SLIPPAGE_PERCENT / 100)
-            else:
-                entry_price = entry_price * (1 - BacktestConfig.SLIPPAGE_PERCENT / 100)
+        sign = LONG if direction == 'long' else SHORT
+        if self._market_orders:
+            entry_price = entry_price * (1 + sign * self._slippage)
         
         # Calculate stop loss
         stop_loss = StopTPCalculator.calculate_stop_loss(data, direction, entry_price)
@@ -542,7 +879,7 @@ class BacktestEngine:
         take_profits = StopTPCalculator.calculate_take_profits(entry_price, stop_loss, direction, regime)
         
         # Calculate position size
-        available_margin = self.equity - sum(p.margin_used for p in self.active_positions.values())
+        available_margin = self.equity - self._total_margin_used
         
         position_size_info = PositionSizer.calculate_position_size(
             self.equity,
@@ -563,11 +900,12 @@ class BacktestEngine:
             original_contracts = contracts
             contracts = max(1, int(contracts * btc_position_mult))
             margin_used = margin_used * btc_position_mult
-            self._log('debug', f"{entry_time} {symbol}: BTC regime adjusted position: {original_contracts} → {contracts} contracts ({btc_position_mult:.1%} multiplier)")
+            if self._debug:
+                self._log('debug', f"{entry_time} {symbol}: BTC regime adjusted position: {original_contracts} → {contracts} contracts ({btc_position_mult:.1%} multiplier)")
         
         # Entry fee
         entry_value = entry_price * contracts
-        entry_fee = entry_value * (BacktestConfig.TAKER_FEE / 100)
+        entry_fee = entry_value * self._taker_fee
         self.total_fees_paid += entry_fee
         
         # Get entry ATR for adaptive stop monitoring
@@ -587,16 +925,36 @@ class BacktestEngine:
             score=score,
             regime=regime,
             entry_reason=reason,
-            realized_pnl=-entry_fee  # Start with negative (entry fee)
+            realized_pnl=-entry_fee,  # Start with negative (entry fee)
+            entry_atr=entry_atr
         )
         
-        # Store entry ATR for adaptive stops (add as attribute)
-        position.entry_atr = entry_atr
-        
         self.active_positions[symbol] = position
+        self._book.add(position)
+        self._open_mask[self._sym_idx[symbol]] = True
+        self._total_margin_used += margin_used
         
         self._log('info', f"{entry_time} {symbol}: {direction.upper()} entry | Price: ${entry_price:.2f} | Score: {score} | Regime: {regime}")
     
+    def _candle_count(self, symbol: str, tf: str, current_time: datetime) -> int:
+        """Number of symbol's tf candles up to current_time (inclusive)"""
+        return int(self._arr[symbol][tf]['ts'].searchsorted(self._datetime64(current_time), side='right'))
+    
+    def _primary_regime(self, symbol: str, i: int) -> str:
+        """
+        Regime of the last 200 primary candles before index i (same window as _get_mtf_data)
+        
+        The result only changes when a new primary candle closes, so it is reused for
+        the entry candles in between (by the signal scan and adaptive stop checks).
+        """
+        cached = self._regimes.get(symbol)
+        if cached is not None and cached[0] == i:
+            return cached[1]
+        
+        regime = RegimeDetector.detect_regime(self.data[symbol][self._primary_tf].iloc[max(0, i - 200):i])
+        self._regimes[symbol] = (i, regime)
+        return regime
+    
     def _get_mtf_data(self, symbol: str, current_time: datetime) -> Optional[Dict]:
         """Get multi-timeframe data up to current_time (NO FUTURE DATA)"""
         if symbol not in self.data:
@@ -604,24 +962,29 @@ class BacktestEngine:
         
         try:
             # Get data for each timeframe
-            htf_df = self.data[symbol][BacktestConfig.HTF_TIMEFRAME]
-            primary_df = self.data[symbol][BacktestConfig.PRIMARY_TIMEFRAME]
-            entry_df = self.data[symbol][BacktestConfig.ENTRY_TIMEFRAME]
+            htf_df = self.data[symbol][self._htf]
+            primary_df = self.data[symbol][self._primary_tf]
+            entry_df = self.data[symbol][self._entry_tf]
+            
+            # Slice the last 200 candles up to current time (inclusive) - binary search, no mask
+            i_htf = self._candle_count(symbol, self._htf, current_time)
+            i_primary = self._candle_count(symbol, self._primary_tf, current_time)
+            i_entry = self._candle_count(symbol, self._entry_tf, current_time)
             
-            # Slice data up to current time (inclusive)
-            htf_data = htf_df[htf_df.index <= current_time].tail(200)
-            primary_data = primary_df[primary_df.index <= current_time].tail(200)
-            entry_data = entry_df[entry_df.index <= current_time].tail(200)
+            htf_data = htf_df.iloc[max(0, i_htf - 200):i_htf]
+            primary_data = primary_df.iloc[max(0, i_primary - 200):i_primary]
+            entry_data = entry_df.iloc[max(0, i_entry - 200):i_entry]
             
             if htf_data.empty or primary_data.empty or entry_data.empty:
                 return None
             
+            # No copies - consumers only read (indicators are precomputed in __init__)
             return {
-                'htf': htf_data.copy(),
-                'primary': primary_data.copy(),
-                'entry': entry_data.copy()
+                'htf': htf_data,
+                'primary': primary_data,
+                'entry': entry_data
             }
-            
+        
         except Exception as e:
             self._log('error', f"Error getting MTF data for {symbol}: {e}")
             return None
@@ -637,13 +1000,13 @@ class BacktestEngine:
             self.consecutive_losses = 0
         
         # Check weekly loss
-        if BacktestConfig.MAX_WEEKLY_LOSS and self.weekly_pnl < 0:
+        if self._max_weekly_loss and self.weekly_pnl < 0:
             weekly_loss_pct = abs(self.weekly_pnl / self.equity)
-            if weekly_loss_pct >= BacktestConfig.MAX_WEEKLY_LOSS:
+            if weekly_loss_pct >= self._max_weekly_loss:
                 return False, f"Weekly loss limit hit: ${self.weekly_pnl:.2f}"
         
         # Check consecutive losses
-        if self.consecutive_losses >= BacktestConfig.MAX_CONSECUTIVE_LOSSES:
+        if self.consecutive_losses >= self._max_consecutive_losses:
             return False, f"{self.consecutive_losses} consecutive losses"
         
         return True, "OK"
@@ -667,14 +1030,10 @@ class BacktestEngine:
         # Calculate profit in R multiples
         entry = position.entry_price
         original_stop = position.stop_loss  # Use current stop as original (we don't modify during trailing)
-        direction = position.direction
+        sign = position.sign
         
-        if direction == 'long':
-            stop_distance = entry - original_stop
-            profit_distance = current_price - entry
-        else:  # short
-            stop_distance = original_stop - entry
-            profit_distance = entry - current_price
+        stop_distance = sign * (entry - original_stop)
+        profit_distance = sign * (current_price - entry)
         
         # Avoid division by zero
         if stop_distance <= 0:
@@ -710,16 +1069,11 @@ class BacktestEngine:
         # Calculate new stop: breakeven + small buffer
         buffer = entry * BacktestConfig.ADAPTIVE_STOP_BREAKEVEN_BUFFER
         
-        if direction == 'long':
-            new_stop = entry + buffer
-            # Only tighten, never widen
-            if new_stop <= position.stop_loss:
-                return (False, None, "would widen stop")
-        else:  # short
-            new_stop = entry - buffer
-            # Only tighten, never widen
-            if new_stop >= position.stop_loss:
-                return (False, None, "would widen stop")
+        new_stop = entry + sign * buffer
+        
+        # Only tighten, never widen
+        if sign * (new_stop - position.stop_loss) <= 0:
+            return (False, None, "would widen stop")
         
         return (True, new_stop, trigger_reason)
     
@@ -737,42 +1091,49 @@ class BacktestEngine:
             if current_time.weekday() == 0:
                 self.weekly_pnl = 0.0
     
+    def _release(self, position: Position):
+        """Drop a position removed from active_positions from the book, mask and margin total"""
+        self._book.remove(position.symbol)
+        self._open_mask[self._sym_idx[position.symbol]] = False
+        # Reset exactly when flat so rounding in the running total can't accumulate
+        self._total_margin_used = self._total_margin_used - position.margin_used if self.active_positions else 0.0
+    
     def _close_all_positions(self, end_time: datetime, reason: str):
         """Close all remaining positions at end of backtest"""
         for symbol in list(self.active_positions.keys()):
             position = self.active_positions[symbol]
             
             # Get last available price
-            df = self.data[symbol][BacktestConfig.ENTRY_TIMEFRAME]
-            last_price = df.loc[end_time, 'close'] if end_time in df.index else position.entry_price
+            arr = self._arr[symbol][self._entry_tf]
+            i = self._bar_index(arr, end_time)
+            last_price = arr['close'][i] if i is not None else position.entry_price
             
             self._close_position(position, end_time, last_price, reason)
-            del self.active_positions[symbol]
+            self._release(self.active_positions.pop(symbol))
     
     def _calculate_results(self) -> Dict:
         """Calculate comprehensive backtest metrics"""
         if not self.closed_trades:
             return {'error': 'No trades executed'}
         
-        # Convert trades to DataFrame for analysis
-        trades_df = pd.DataFrame([vars(t) for t in self.closed_trades])
-        
-        # Basic metrics
-        total_trades = len(self.closed_trades)
-        wins = trades_df[trades_df['pnl'] > 0]
-        losses = trades_df[trades_df['pnl'] <= 0]
+        # Basic metrics (from the columnar trade arrays)
+        total_trades = self._n_trades
+        pnl = self._pnl_arr[:total_trades]
+        win_mask = pnl > 0
+        wins = pnl[win_mask]
+        losses = pnl[~win_mask]
         
         win_count = len(wins)
         loss_count = len(losses)
         win_rate = (win_count / total_trades * 100) if total_trades > 0 else 0
         
         # P&L metrics
-        total_pnl = trades_df['pnl'].sum()
-        gross_profit = wins['pnl'].sum() if len(wins) > 0 else 0
-        gross_loss = abs(losses['pnl'].sum()) if len(losses) > 0 else 0
+        total_pnl = pnl.sum()
+        gross_profit = wins.sum() if len(wins) > 0 else 0
+        gross_loss = abs(losses.sum()) if len(losses) > 0 else 0
         
-        avg_win = wins['pnl'].mean() if len(wins) > 0 else 0
-        avg_loss = losses['pnl'].mean() if len(losses) > 0 else 0
+        avg_win = wins.mean() if len(wins) > 0 else 0
+        avg_loss = losses.mean() if len(losses) > 0 else 0
         
         profit_factor = gross_profit / gross_loss if gross_loss > 0 else float('inf')
         
@@ -780,31 +1141,27 @@ class BacktestEngine:
         expectancy = total_pnl / total_trades if total_trades > 0 else 0
         
         # Equity curve analysis
-        equity_df = pd.DataFrame(self.equity_curve, columns=['time', 'equity'])
-        equity_df.set_index('time', inplace=True)
+        equity = self._eq_vals[:self._n_equity]
         
         # Drawdown calculation
-        equity_df['peak'] = equity_df['equity'].cummax()
-        equity_df['drawdown'] = (equity_df['equity'] - equity_df['peak']) / equity_df['peak'] * 100
-        max_drawdown = equity_df['drawdown'].min()
+        peak = np.maximum.accumulate(equity)
+        drawdown = (equity - peak) / peak * 100
+        max_drawdown = drawdown.min() if len(drawdown) else np.nan
         
         # Returns
         final_equity = self.equity
         total_return = ((final_equity - self.initial_equity) / self.initial_equity) * 100
         
-        # Sharpe ratio (simplified - assumes daily data)
-        equity_df['returns'] = equity_df['equity'].pct_change()
-        sharpe_ratio = (equity_df['returns'].mean() / equity_df['returns'].std() * np.sqrt(252)) if equity_df['returns'].std() > 0 else 0
-        
-        # Longest losing streak
-        streak = 0
-        max_streak = 0
-        for trade in self.closed_trades:
-            if trade.pnl < 0:
-                streak += 1
-                max_streak = max(max_streak, streak)
-            else:
-                streak = 0
+        # Sharpe ratio (simplified - assumes daily data; sample std like pandas)
+        returns = np.diff(equity) / equity[:-1]
+        returns_std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+        sharpe_ratio = (returns.mean() / returns_std * np.sqrt(252)) if returns_std > 0 else 0
+        
+        # Longest losing streak (losing trades share a run id that only advances on non-losses)
+        losing = pnl < 0
+        run_ids = np.cumsum(~losing)
+        run_lengths = np.bincount(run_ids[losing])
+        max_streak = int(run_lengths.max()) if run_lengths.size else 0
         
         results = {
             'total_trades': total_trades,
@@ -825,10 +1182,28 @@ class BacktestEngine:
             'initial_equity': self.initial_equity,
             'final_equity': round(final_equity, 2),
             'total_fees_paid': round(self.total_fees_paid, 2),
-            'avg_duration_hours': round(trades_df['duration_hours'].mean(), 2),
-            'trades_by_regime': trades_df.groupby('regime')['pnl'].agg(['count', 'sum', 'mean']).to_dict(),
-            'trades_by_symbol': trades_df.groupby('symbol')['pnl'].agg(['count', 'sum', 'mean']).to_dict(),
-            'trades_by_exit_reason': trades_df.groupby('exit_reason')['pnl'].agg(['count', 'sum']).to_dict()
+            'avg_duration_hours': round(self._duration_arr[:total_trades].mean(), 2),
+            'trades_by_regime': self._group_pnl('regime', pnl),
+            'trades_by_symbol': self._group_pnl('symbol', pnl),
+            'trades_by_exit_reason': self._group_pnl('exit_reason', pnl, with_mean=False)
         }
         
         return results
+    
+    def _group_pnl(self, label: str, pnl: np.ndarray, with_mean: bool = True) -> Dict:
+        """P&L count/sum(/mean) per value of a TRADE_LABELS field, shaped like groupby(...).agg([...]).to_dict()"""
+        categories = self._categories[label]
+        codes = self._label_codes[TRADE_LABELS.index(label), :len(pnl)]
+        
+        # One pass over the codes per statistic; bins follow code order, keys are sorted
+        counts = np.bincount(codes, minlength=len(categories)).tolist()
+        sums = np.bincount(codes, weights=pnl, minlength=len(categories)).tolist()
+        
+        keys = sorted(categories)
+        stats = {
+            'count': {k: counts[categories[k]] for k in keys},
+            'sum': {k: sums[categories[k]] for k in keys}
+        }
+        if with_mean:
+            stats['mean'] = {k: sums[categories[k]] / counts[categories[k]] for k in keys}
+        return stats
@@ -6,10 +6,21 @@ This script converts daily historical crypto data from various sources
 """
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from pathlib import Path
 from loguru import logger
 import sys
 
+# Source columns used, in backtest order (renamed to lower case)
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# One typed pyarrow pass: ISO dates and float prices (empty / NaN / null cells become NaN)
+CSV_CONVERT_OPTIONS = pa_csv.ConvertOptions(
+    column_types={'Date': pa.timestamp('us'), **{col: pa.float64() for col in PRICE_COLUMNS}},
+    include_columns=['Date'] + PRICE_COLUMNS
+)
+
 class HistoricalDataImporter:
     """Import and convert historical CSV data for backtesting"""
     
@@ -39,7 +50,29 @@ class HistoricalDataImporter:
         
         logger.info(f"Importing {filename} as {symbol}")
         
-        # Read CSV
+        # Read CSV - parsed and typed by pyarrow in one pass; files it can't convert
+        # strictly (other date formats, stray text in a price column) go through pandas
+        try:
+            df = pa_csv.read_csv(filepath, convert_options=CSV_CONVERT_OPTIONS).to_pandas()
+            df.set_index('Date', inplace=True)
+            df.columns = [col.lower() for col in PRICE_COLUMNS]
+        except pa.ArrowInvalid as e:
+            logger.debug(f"pyarrow could not parse {filename} ({e}), reading with pandas")
+            df = self._read_csv_pandas(filepath)
+        
+        # Remove any NaN values
+        df = df.dropna()
+        
+        # Sort by date (ascending)
+        df = df.sort_index()
+        
+        logger.info(f"✓ Loaded {len(df)} daily candles from {df.index.min().date()} to {df.index.max().date()}")
+        
+        return df
+    
+    @staticmethod
+    def _read_csv_pandas(filepath: Path) -> pd.DataFrame:
+        """Lenient CSV read: any date format pandas understands, bad prices become NaN"""
         df = pd.read_csv(filepath)
         
         # Convert Date column to datetime and set as index
@@ -47,21 +80,13 @@ class HistoricalDataImporter:
         df.set_index('Date', inplace=True)
         
         # Select and rename columns to match backtest format
-        df = df[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
-        df.columns = ['open', 'high', 'low', 'close', 'volume']
+        df = df[PRICE_COLUMNS].copy()
+        df.columns = [col.lower() for col in PRICE_COLUMNS]
         
         # Ensure numeric types
-        for col in ['open', 'high', 'low', 'close', 'volume']:
+        for col in df.columns:
             df[col] = pd.to_numeric(df[col], errors='coerce')
         
-        # Remove any NaN values
-        df = df.dropna()
-        
-        # Sort by date (ascending)
-        df = df.sort_index()
-        
-        logger.info(f"✓ Loaded {len(df)} daily candles from {df.index.min().date()} to {df.index.max().date()}")
-        
         return df
     
     def save_to_backtest_format(self, df: pd.DataFrame, symbol: str, timeframe: str = '1d'):
@@ -69,10 +94,12 @@ class HistoricalDataImporter:
         start_date = df.index.min().strftime('%Y%m%d')
         end_date = df.index.max().strftime('%Y%m%d')
         
-        filename = f"{symbol}_{timeframe}_{start_date}_{end_date}.csv"
+        filename = f"{symbol}_{timeframe}_{start_date}_{end_date}.parquet"
         filepath = self.output_dir / filename
         
-        df.to_csv(filepath)
+        # Same layout as the Binance downloads (timestamp index, zstd Parquet),
+        # so data_loader reads it typed without re-parsing text
+        df.rename_axis('timestamp').to_parquet(filepath, compression='zstd')
         logger.info(f"✓ Saved to {filepath}")
         
         return filepath
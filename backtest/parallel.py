@@ -0,0 +1,140 @@
+"""
+Parallel Backtest Runner - one single-symbol backtest per worker process
+
+Each symbol is replayed by its own BacktestEngine (with BTCUSDT loaded as
+reference data for the BTC regime check), so symbols don't share equity,
+cooldowns or the MAX_TOTAL_ACTIVE_SIGNALS limit. Results therefore approximate
+the portfolio replay of BacktestEngine.run() - use this for per-symbol studies
+and quick parameter sweeps, and the regular engine for final numbers.
+
+Workers read the OHLCV data from one shared memory block (SharedDataSet).
+Pool size: BACKTEST_WORKERS environment variable, default cpu_count().
+"""
+
+import os
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+try:
+    from tqdm import tqdm
+    TQDM_AVAILABLE = True
+except ImportError:
+    TQDM_AVAILABLE = False
+
+from backtest.config import BacktestConfig
+from backtest.data_loader import SharedDataSet
+from backtest.engine import BacktestEngine, Trade
+
+REFERENCE_SYMBOLS = ('BTCUSDT',)
+
+def snapshot_config() -> Dict:
+    """BacktestConfig settings as set in this process (incl. runtime overrides), for worker processes"""
+    return {k: v for k, v in vars(BacktestConfig).items() if k.isupper()}
+
+def apply_config(config: Dict):
+    """Set a snapshot_config() on BacktestConfig (in a worker process)"""
+    for name, value in config.items():
+        setattr(BacktestConfig, name, value)
+
+def _run_symbol(
+    data: Dict[str, Dict[str, pd.DataFrame]],
+    symbol: str
+) -> Tuple[List[Trade], List[Tuple[datetime, float]], float]:
+    """Single-symbol backtest -> (closed_trades, equity_curve, total_fees_paid)"""
+    engine_data = {s: data[s] for s in (symbol, *REFERENCE_SYMBOLS) if s in data}
+    engine = BacktestEngine(engine_data, trade_symbols=[symbol])
+    engine.run()
+    return engine.closed_trades, engine.equity_curve, engine.total_fees_paid
+
+def _run_symbol_worker(handle, config: Dict, symbol: str):
+    """Worker process entry point: attach to the shared data and run one symbol"""
+    apply_config(config)
+    
+    with SharedDataSet.attached(handle) as data:
+        return _run_symbol(data, symbol)
+
+class ParallelBacktestOrchestrator:
+    """Run independent per-symbol backtests across a process pool and merge them"""
+    
+    MAX_WORKERS = int(os.environ.get('BACKTEST_WORKERS', 0)) or os.cpu_count() or 1
+    
+    def __init__(self, data: Dict[str, Dict[str, pd.DataFrame]]):
+        """
+        Args:
+            data: Dict[symbol][timeframe] = DataFrame (as from load_all_data)
+        """
+        self.data = data
+    
+    def run(self, symbols: Optional[List[str]] = None) -> Tuple[Dict, BacktestEngine]:
+        """
+        Backtest each symbol on its own and combine the results
+        
+        Args:
+            symbols: Symbols to trade (default: all in data)
+        
+        Returns:
+            (results, engine) - results as from BacktestEngine.run(); engine holds
+            the merged closed_trades and equity_curve (for print/save_results)
+        """
+        symbols = [s for s in (symbols or self.data) if s in self.data]
+        if not symbols:
+            raise ValueError("No data available for backtesting")
+        
+        workers = min(self.MAX_WORKERS, len(symbols))
+        per_symbol = {}
+        
+        if workers > 1:
+            shared = SharedDataSet(self.data)
+            config = snapshot_config()
+            config['SHOW_PROGRESS_BAR'] = False  # One bar for the whole pool instead
+            config['INDICATOR_WORKERS'] = 1  # Already one process per symbol
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = {
+                        executor.submit(_run_symbol_worker, shared.handle, config, symbol): symbol
+                        for symbol in symbols
+                    }
+                    completed = as_completed(futures)
+                    if BacktestConfig.SHOW_PROGRESS_BAR and TQDM_AVAILABLE:
+                        completed = tqdm(completed, total=len(futures), desc="Backtesting symbols", unit="symbols", ncols=100)
+                    
+                    for future in completed:
+                        per_symbol[futures[future]] = future.result()
+            finally:
+                shared.unlink()
+        else:
+            for symbol in symbols:
+                per_symbol[symbol] = _run_symbol(self.data, symbol)
+        
+        engine = self._merge([per_symbol[s] for s in symbols])
+        
+        if BacktestConfig.ENABLE_LOGGING:
+            logger.info(f"Parallel backtest complete: {len(symbols)} symbols, {workers} workers, {len(engine.closed_trades)} trades")
+        
+        return engine._calculate_results(), engine
+    
+    @staticmethod
+    def _merge(runs: List[Tuple[List[Trade], List[Tuple[datetime, float]], float]]) -> BacktestEngine:
+        """Combine per-symbol runs into one engine (trades by exit time, summed P&L curve)"""
+        engine = BacktestEngine({})
+        initial = engine.initial_equity
+        
+        trades = [t for closed_trades, _, _ in runs for t in closed_trades]
+        for trade in sorted(trades, key=lambda t: t.exit_time):
+            engine._store_trade(trade)
+        engine.total_fees_paid = sum(fees for _, _, fees in runs)
+        engine.equity = initial + sum(t.pnl for t in trades)
+        
+        # Portfolio equity = initial + each symbol's P&L so far (carried forward between its candles)
+        curves = [
+            pd.Series(dict(curve)) - initial
+            for _, curve, _ in runs if curve
+        ]
+        if curves:
+            pnl = pd.concat(curves, axis=1).sort_index().ffill().fillna(0.0).sum(axis=1)
+            for time, equity in zip(pnl.index, (pnl + initial).tolist()):
+                engine._record_equity(time, equity)
+        
+        return engine
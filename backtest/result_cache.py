@@ -0,0 +1,123 @@
+"""
+Backtest result cache - skip re-running identical backtests
+
+A run is identified by a SHA-256 over:
+- the OHLCV data (index and price/volume arrays of every symbol/timeframe)
+- the traded symbols
+- the BacktestConfig and live Config settings (credentials excluded)
+- the source of the engine and the strategy/analysis/risk modules
+
+Editing any of these gives a new key, so stale results are never reused.
+Entries are pickles of the results, closed trades and equity curve under
+BacktestConfig.RESULT_CACHE_DIR.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from backtest.config import BacktestConfig, LIVE_SETTINGS, _live_config
+from backtest.data_loader import OHLCV_COLUMNS
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# Code whose changes invalidate cached results
+CODE_PATHS = (
+    'backtest/engine.py',
+    'backtest/_kernels.py',
+    'src/analysis',
+    'src/strategy',
+    'src/risk',
+)
+
+# Live Config settings left out of the key (credentials, endpoints)
+IGNORED_SETTING_SUFFIXES = ('_KEY', '_PASSPHRASE', '_URL')
+
+def _settings(cls) -> Dict:
+    """Upper-case, JSON-friendly class attributes (config values)"""
+    return {
+        name: value for name, value in vars(cls).items()
+        if name.isupper()
+        and not name.endswith(IGNORED_SETTING_SUFFIXES)
+        and not callable(value)
+    }
+
+def _code_files() -> Iterable[Path]:
+    for rel in CODE_PATHS:
+        path = ROOT_DIR / rel
+        if path.is_dir():
+            yield from sorted(path.rglob('*.py'))
+        elif path.exists():
+            yield path
+
+class ResultCache:
+    """On-disk cache of backtest results keyed by data, config and code"""
+    
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir or BacktestConfig.RESULT_CACHE_DIR)
+        self.hits = 0
+        self.misses = 0
+    
+    def key(self, data: Dict[str, Dict[str, pd.DataFrame]], trade_symbols: Iterable[str]) -> str:
+        """Cache key for a run over `data` trading `trade_symbols`"""
+        h = hashlib.sha256()
+        
+        for symbol in sorted(data):
+            for timeframe in sorted(data[symbol]):
+                df = data[symbol][timeframe]
+                h.update(f"{symbol}|{timeframe}|{len(df)}".encode())
+                h.update(np.ascontiguousarray(df.index.values).tobytes())
+                h.update(np.ascontiguousarray(df[OHLCV_COLUMNS].to_numpy(dtype=np.float64)).tobytes())
+        
+        settings = _settings(BacktestConfig)
+        live = _live_config()
+        settings.update({name: getattr(BacktestConfig, name) for name in LIVE_SETTINGS})
+        h.update(json.dumps(
+            {'trade_symbols': list(trade_symbols), 'backtest': settings, 'live': _settings(live)},
+            sort_keys=True, default=str
+        ).encode())
+        
+        for path in _code_files():
+            h.update(str(path.relative_to(ROOT_DIR)).encode())
+            h.update(path.read_bytes())
+        
+        return h.hexdigest()
+    
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached payload for key, or None"""
+        try:
+            with open(self._path(key), 'rb') as f:
+                payload = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return payload
+    
+    def put(self, key: str, payload: Dict):
+        """Store payload (best effort - a failed write only costs the next run)"""
+        tmp_path = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.warning(f"Could not write backtest result cache: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def stats(self) -> str:
+        return f"{self.hits} hit(s), {self.misses} miss(es) in {self.cache_dir}"
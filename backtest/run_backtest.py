@@ -12,12 +12,26 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from loguru import logger
 from datetime import datetime
 import json
+import math
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from backtest.config import BacktestConfig
 from backtest.data_loader import HistoricalDataFetcher
 from backtest.engine import BacktestEngine
 from backtest.check_data_availability import DataAvailabilityChecker
 
+# Trade fields written to the results JSON and trades CSV (in column order)
+TRADE_FIELDS = (
+    'symbol', 'direction', 'entry_time', 'entry_price', 'exit_time', 'exit_price',
+    'pnl', 'pnl_percent', 'exit_reason', 'regime', 'score', 'duration_hours'
+)
+
 def main():
     """Run complete backtest"""
     # Configure logging based on ENABLE_LOGGING setting
@@ -162,12 +176,32 @@ def print_results(results: dict, engine: BacktestEngine):
     
     print("\n" + "="*80)
 
+def _trade_columns(trades: list) -> dict:
+    """Saved Trade fields as {field: list of values}, times as strings"""
+    columns = {name: [getattr(t, name) for t in trades] for name in TRADE_FIELDS}
+    for name in ('entry_time', 'exit_time'):
+        columns[name] = [str(value) for value in columns[name]]
+    return columns
+
+def _json_safe(value):
+    """value with NaN/inf floats replaced by None, so both JSON encoders write null"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    return value
+
 def save_results(results: dict, engine: BacktestEngine, symbols: list):
     """Save results to JSON file"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"backtest_{timestamp}.json"
     filepath = Path(__file__).parent / 'results' / filename
     
+    # Trade fields as columns (one pass over the trades) - the JSON records and CSV use them
+    trade_columns = _trade_columns(engine.closed_trades)
+    
     # Prepare data for JSON
     output = {
         'config': {
@@ -180,40 +214,30 @@ def save_results(results: dict, engine: BacktestEngine, symbols: list):
             'fees': BacktestConfig.TAKER_FEE
         },
         'results': results,
-        'trades': [
-            {
-                'symbol': t.symbol,
-                'direction': t.direction,
-                'entry_time': str(t.entry_time),
-                'entry_price': t.entry_price,
-                'exit_time': str(t.exit_time),
-                'exit_price': t.exit_price,
-                'pnl': t.pnl,
-                'pnl_percent': t.pnl_percent,
-                'exit_reason': t.exit_reason,
-                'regime': t.regime,
-                'score': t.score,
-                'duration_hours': t.duration_hours
-            }
-            for t in engine.closed_trades
-        ],
+        'trades': [dict(zip(trade_columns, row)) for row in zip(*trade_columns.values())],
         'equity_curve': [
             {'time': str(time), 'equity': equity}
             for time, equity in engine.equity_curve
         ]
     }
     
-    with open(filepath, 'w') as f:
-        json.dump(output, f, indent=2)
+    # Non-finite metrics (e.g. profit_factor with no losses) are saved as null either way:
+    # orjson writes null, json.dump would write the non-standard Infinity/NaN
+    output = _json_safe(output)
+    
+    if ORJSON_AVAILABLE:
+        # One encode in C, one write - json.dump pretty-prints element by element
+        filepath.write_bytes(orjson.dumps(output, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(filepath, 'w') as f:
+            json.dump(output, f, indent=2)
     
     if BacktestConfig.ENABLE_LOGGING:
         logger.info(f"Results saved to: {filepath}")
     
-    # Also save a CSV of trades for easy analysis
-    import pandas as pd
-    trades_df = pd.DataFrame(output['trades'])
+    # Also save a CSV of trades for easy analysis (Arrow's writer, straight from the columns)
     csv_path = filepath.with_suffix('.csv')
-    trades_df.to_csv(csv_path, index=False)
+    pa_csv.write_csv(pa.Table.from_pydict(trade_columns), str(csv_path))
     if BacktestConfig.ENABLE_LOGGING:
         logger.info(f"Trades CSV saved to: {csv_path}")
 
@@ -8,16 +8,46 @@ This prevents overfitting - we test on data the "bot" has never seen before.
 """
 
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from loguru import logger
 from datetime import datetime, timedelta
+from typing import Dict
 import pandas as pd
 
 from backtest.config import BacktestConfig
-from backtest.data_loader import HistoricalDataFetcher
+from backtest.data_loader import HistoricalDataFetcher, SharedDataSet
 from backtest.engine import BacktestEngine
+from backtest.parallel import apply_config, snapshot_config
+
+def _split_symbol(symbol: str, frames: dict, split_date: datetime):
+    """Train and test frames of one symbol"""
+    train_frames = {}
+    test_frames = {}
+    
+    for timeframe, df in frames.items():
+        # Debug: print date range and split
+        if symbol == "BTCUSDT" and timeframe == "5m":
+            logger.debug(f"Data range: {df.index.min()} to {df.index.max()}")
+            logger.debug(f"Split date: {split_date} (type: {type(split_date)})")
+            logger.debug(f"Index dtype: {df.index.dtype}")
+        
+        # Split on date - frames are time-sorted, so a binary search finds the first test
+        # candle; both halves are slices (the engine only reads its input frames)
+        i = df.index.searchsorted(split_date, side='left')
+        train_df = df.iloc[:i]
+        test_df = df.iloc[i:]
+        
+        if symbol == "BTCUSDT" and timeframe == "5m":
+            logger.debug(f"Train size: {len(train_df)}, Test size: {len(test_df)}")
+        
+        train_frames[timeframe] = train_df
+        test_frames[timeframe] = test_df
+    
+    return train_frames, test_frames
 
 def split_data(data: dict, split_date: datetime):
     """
@@ -34,30 +64,42 @@ def split_data(data: dict, split_date: datetime):
     test_data = {}
     
     for symbol in data:
-        train_data[symbol] = {}
-        test_data[symbol] = {}
-        
-        for timeframe in data[symbol]:
-            df = data[symbol][timeframe]
-            
-            # Debug: print date range and split
-            if symbol == "BTCUSDT" and timeframe == "5m":
-                logger.debug(f"Data range: {df.index.min()} to {df.index.max()}")
-                logger.debug(f"Split date: {split_date} (type: {type(split_date)})")
-                logger.debug(f"Index dtype: {df.index.dtype}")
-            
-            # Split on date
-            train_df = df[df.index < split_date].copy()
-            test_df = df[df.index >= split_date].copy()
-            
-            if symbol == "BTCUSDT" and timeframe == "5m":
-                logger.debug(f"Train size: {len(train_df)}, Test size: {len(test_df)}")
-            
-            train_data[symbol][timeframe] = train_df
-            test_data[symbol][timeframe] = test_df
+        train_data[symbol], test_data[symbol] = _split_symbol(symbol, data[symbol], split_date)
     
     return train_data, test_data
 
+def _run_period(handle, config: Dict, split_date: datetime, period: str) -> dict:
+    """Worker process entry point: backtest the 'train' or 'test' period of the shared data"""
+    apply_config(config)
+    
+    with SharedDataSet.attached(handle) as data:
+        train_data, test_data = split_data(data, split_date)
+        return BacktestEngine(train_data if period == 'train' else test_data).run()
+
+def _run_periods(data: dict, split_date: datetime):
+    """
+    Split data at split_date and backtest both periods -> (train_results, test_results)
+    
+    The two runs are independent, so with PARALLEL_WALK_FORWARD they run side by
+    side in two processes, both reading the data from one SharedDataSet.
+    """
+    if BacktestConfig.PARALLEL_WALK_FORWARD:
+        shared = SharedDataSet(data)
+        config = snapshot_config()
+        config['SHOW_PROGRESS_BAR'] = False  # Two bars would overwrite each other
+        config['INDICATOR_WORKERS'] = 1  # One process per period already
+        try:
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                train_results, test_results = executor.map(
+                    _run_period, repeat(shared.handle), repeat(config), repeat(split_date), ('train', 'test')
+                )
+        finally:
+            shared.unlink()
+        return train_results, test_results
+    
+    train_data, test_data = split_data(data, split_date)
+    return BacktestEngine(train_data).run(), BacktestEngine(test_data).run()
+
 def run_walk_forward():
     """
     Run walk-forward test
@@ -107,17 +149,13 @@ def run_walk_forward():
     logger.info(f"  Train: {start.date()} to {split_date.date()} ({train_days} days)")
     logger.info(f"  Test:  {split_date.date()} to {end.date()} ({total_days - train_days} days)")
     
-    # Split data
-    train_data, test_data = split_data(data, split_date)
+    # Split data and run on train and test data
+    train_results, test_results = _run_periods(data, split_date)
     
-    # Run on train data
     logger.info("\n" + "="*80)
     logger.info("TRAINING PERIOD BACKTEST")
     logger.info("="*80)
     
-    train_engine = BacktestEngine(train_data)
-    train_results = train_engine.run()
-    
     if 'error' in train_results:
         logger.error(f"Training backtest failed: {train_results['error']}")
         return
@@ -129,9 +167,6 @@ def run_walk_forward():
     logger.info("TESTING PERIOD BACKTEST (UNSEEN DATA)")
     logger.info("="*80)
     
-    test_engine = BacktestEngine(test_data)
-    test_results = test_engine.run()
-    
     if 'error' in test_results:
         logger.error(f"Testing backtest failed: {test_results['error']}")
         return
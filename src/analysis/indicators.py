@@ -1,8 +1,7 @@
 import pandas as pd
 import numpy as np
 from typing import Dict
-from ta.trend import EMAIndicator, MACD, ADXIndicator
-from ta.volatility import AverageTrueRange
+from ta.trend import EMAIndicator, MACD
 from ta.momentum import RSIIndicator
 
 class Indicators:
@@ -36,14 +35,29 @@ class Indicators:
     
     @staticmethod
     def calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
-        """Calculate Average True Range"""
-        atr = AverageTrueRange(
-            high=df['high'],
-            low=df['low'],
-            close=df['close'],
-            window=period
-        )
-        return atr.average_true_range()
+        """
+        Calculate Average True Range
+        
+        Same arithmetic as ta's AverageTrueRange(...).average_true_range() (Wilder
+        smoothing seeded with the mean of the first `period` true ranges), with the
+        recurrence run over plain floats instead of per-row Series indexing.
+        """
+        prev_close = df['close'].shift(1)
+        true_range = pd.DataFrame(data={
+            'tr1': df['high'] - df['low'],
+            'tr2': (df['high'] - prev_close).abs(),
+            'tr3': (df['low'] - prev_close).abs()
+        }).max(axis=1)
+        
+        atr = np.zeros(len(true_range))
+        atr[period - 1] = true_range[0:period].mean()
+        prev = atr[period - 1]
+        items = true_range.to_numpy(dtype=np.float64).tolist()
+        for i in range(period, len(atr)):
+            prev = (prev * (period - 1) + items[i]) / float(period)
+            atr[i] = prev
+        
+        return pd.Series(atr, index=true_range.index, name='atr')
     
     @staticmethod
     def calculate_rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
@@ -53,14 +67,58 @@ class Indicators:
     
     @staticmethod
     def calculate_adx(df: pd.DataFrame, period: int = 14) -> float:
-        """Calculate ADX for trend strength"""
-        adx = ADXIndicator(
-            high=df['high'],
-            low=df['low'],
-            close=df['close'],
-            window=period
-        )
-        return adx.adx().iloc[-1]
+        """
+        Calculate ADX for trend strength (latest value)
+        
+        Same arithmetic, in the same order, as ta's ADXIndicator(...).adx().iloc[-1],
+        so results are identical - but on plain arrays instead of per-element
+        Series indexing, which made ta's version the slowest part of a regime check.
+        """
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        close = df['close'].to_numpy(dtype=np.float64)
+        
+        # True range and directional movement (first row is NaN, as in ta)
+        close_shift = np.concatenate(([np.nan], close[:-1]))
+        tr = np.amax([high, close_shift], axis=0) - np.amin([low, close_shift], axis=0)
+        diff_up = high - np.concatenate(([np.nan], high[:-1]))
+        diff_down = np.concatenate(([np.nan], low[:-1])) - low
+        pos = np.abs(((diff_up > diff_down) & (diff_up > 0)) * diff_up)
+        neg = np.abs(((diff_down > diff_up) & (diff_down > 0)) * diff_down)
+        
+        # Wilder smoothing; like ta, the last element stays 0 (it doesn't reach the result)
+        n = len(close) - (period - 1)
+        smoothed = []
+        for values in (tr, pos, neg):
+            out = np.zeros(n)
+            out[0] = values[~np.isnan(values)][0:period].sum()
+            prev = out[0]
+            items = values.tolist()
+            for i in range(1, n - 1):
+                prev = prev - (prev / float(period)) + items[period + i]
+                out[i] = prev
+            smoothed.append(out)
+        trs, dip_sum, din_sum = smoothed
+        
+        nonzero = trs != 0
+        dip = np.zeros(n)
+        din = np.zeros(n)
+        dip[nonzero] = 100 * (dip_sum[nonzero] / trs[nonzero])
+        din[nonzero] = 100 * (din_sum[nonzero] / trs[nonzero])
+        
+        di_total = dip + din
+        directional_index = np.zeros(n)
+        valid = di_total != 0
+        directional_index[valid] = 100 * np.abs((dip[valid] - din[valid]) / di_total[valid])
+        
+        adx = np.zeros(n)
+        adx[period] = directional_index[0:period].mean()
+        prev = adx[period]
+        di_items = directional_index.tolist()
+        for i in range(period + 1, n):
+            prev = ((prev * (period - 1)) + di_items[i - 1]) / float(period)
+        
+        return prev
     
     @staticmethod
     def add_all_indicators(df: pd.DataFrame) -> pd.DataFrame:
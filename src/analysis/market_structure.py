@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from typing import Optional, Tuple
 from loguru import logger
@@ -175,11 +176,11 @@ class MarketStructure:
                 structure_level = historical_df.tail(lookback)['high'].max()
                 
                 # Check if price has broken above this level in recent bars
-                # Search from MOST RECENT to OLDEST to find the freshest BOS
-                for i in range(len(recent_df) - 1, -1, -1):
-                    if recent_df.iloc[i]['high'] > structure_level:
-                        bars_ago = len(recent_df) - 1 - i
-                        return True, bars_ago, structure_level
+                # The freshest BOS is the MOST RECENT bar beyond it
+                broken = np.flatnonzero(recent_df['high'].to_numpy() > structure_level)
+                if len(broken):
+                    bars_ago = len(recent_df) - 1 - int(broken[-1])
+                    return True, bars_ago, structure_level
                 
                 return False, 0, structure_level
             
@@ -188,11 +189,11 @@ class MarketStructure:
                 structure_level = historical_df.tail(lookback)['low'].min()
                 
                 # Check if price has broken below this level in recent bars
-                # Search from MOST RECENT to OLDEST to find the freshest BOS
-                for i in range(len(recent_df) - 1, -1, -1):
-                    if recent_df.iloc[i]['low'] < structure_level:
-                        bars_ago = len(recent_df) - 1 - i
-                        return True, bars_ago, structure_level
+                # The freshest BOS is the MOST RECENT bar beyond it
+                broken = np.flatnonzero(recent_df['low'].to_numpy() < structure_level)
+                if len(broken):
+                    bars_ago = len(recent_df) - 1 - int(broken[-1])
+                    return True, bars_ago, structure_level
                 
                 return False, 0, structure_level
             